@@ -0,0 +1,68 @@
+"""
+Benchmark of rule firing with a large number of pending activations.
+
+Compares the heap-backed `DepthStrategy` against a strategy that
+rebuilds and sorts the whole agenda after every change (the way
+`DepthStrategy` used to work).
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/agenda_fire.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+from pyknow.strategies import DepthStrategy
+
+
+class SortingDepthStrategy(DepthStrategy):
+    def _update_agenda(self, agenda, added, removed):
+        activations = list(agenda.activations)
+        activations.extend(added)
+
+        for act in removed:
+            try:
+                activations.remove(act)
+            except ValueError:
+                pass
+
+        return sorted(activations, key=self.get_key)
+
+
+class Item(Fact):
+    pass
+
+
+class Pending(KnowledgeEngine):
+    @Rule(Item(value=W('value')))
+    def item(self, value):
+        pass
+
+
+class SortingPending(Pending):
+    __strategy__ = SortingDepthStrategy
+
+
+def fire(engine_class, pending, steps):
+    ke = engine_class()
+    ke.reset()
+    ke.declare_many(Item(value=i) for i in range(pending))
+
+    begin = default_timer()
+    ke.run(steps)
+    return (default_timer() - begin) / steps
+
+
+def main(sizes=(1000, 5000, 20000), steps=100):
+    warnings.simplefilter('ignore')
+    print("%10s %18s %18s" % ("pending", "heap (us/fire)", "sort (us/fire)"))
+    for n in sizes:
+        print("%10d %18.1f %18.1f" % (n,
+                                      fire(Pending, n, steps) * 1e6,
+                                      fire(SortingPending, n, steps) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
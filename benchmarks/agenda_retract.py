@@ -0,0 +1,64 @@
+"""
+Benchmark of retract-heavy workloads with many pending activations.
+
+Compares the agenda fact index against scanning all the pending
+activations on every retract to find the ones using the fact.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/agenda_retract.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+from pyknow.agenda import Agenda
+
+
+class ScanningAgenda(Agenda):
+    def remove_from_fact(self, fact):
+        removed = 0
+        for activation in list(self._entries):
+            if any(f['__factid__'] == fact for f in activation.facts):
+                while self.remove(activation):
+                    removed += 1
+        return removed
+
+
+class Item(Fact):
+    pass
+
+
+class Pending(KnowledgeEngine):
+    @Rule(Item(value=W('value')))
+    def item(self, value):
+        pass
+
+
+def retract(agenda_class, pending, retracts):
+    ke = Pending()
+    ke.reset()
+    ke.agenda = agenda_class()
+    ke.declare_many(Item(value=i) for i in range(pending))
+    facts = list(ke.facts.facts.values())[-retracts:]
+
+    begin = default_timer()
+    for fact in facts:
+        ke.retract(fact)
+    return (default_timer() - begin) / retracts
+
+
+def main(sizes=(1000, 5000, 20000), retracts=200):
+    warnings.simplefilter('ignore')
+    print("%10s %20s %20s" % ("pending", "index (us/retract)",
+                              "scan (us/retract)"))
+    for n in sizes:
+        print("%10d %20.1f %20.1f" % (
+            n,
+            retract(Agenda, n, retracts) * 1e6,
+            retract(ScanningAgenda, n, retracts) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark of fact declaration with many rules testing the same slot
+against different literals.
+
+Builds an engine with one rule per country (``Txn(country='C0')``,
+``Txn(country='C1')``...) and declares transactions of random
+countries. The children testing literals are hashed by value, so the
+time per fact should not grow with the number of rules.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/alpha_hashing.py
+
+"""
+from random import Random
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+
+
+class Txn(Fact):
+    pass
+
+
+def engine_class(countries):
+    def rhs(self, amount):
+        pass
+
+    rules = {'country%d' % i: Rule(Txn(country='C%d' % i,
+                                       amount=W('amount')))(rhs)
+             for i in range(countries)}
+    return type('Engine%d' % countries, (KnowledgeEngine, ), rules)
+
+
+def declare(countries, facts, seed=0):
+    ke = engine_class(countries)()
+    ke.reset()
+
+    random = Random(seed)
+    batch = [Txn(id=i, country='C%d' % random.randrange(countries),
+                 amount=i)
+             for i in range(facts)]
+    begin = default_timer()
+    ke.declare_many(batch)
+    return (default_timer() - begin) / facts
+
+
+def main(sizes=(1, 10, 100, 300), facts=5000):
+    warnings.simplefilter('ignore')
+    print("%10s %18s" % ("literals", "declare (us/fact)"))
+    for countries in sizes:
+        print("%10d %18.1f" % (countries, declare(countries, facts) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
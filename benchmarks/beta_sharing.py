@@ -0,0 +1,80 @@
+"""
+Report of the join nodes shared by rules with common pattern prefixes.
+
+Builds an engine with `rules` rules starting with the same three
+patterns (customer, order and order line) and ending with a different
+product category, declares some facts and prints the sharing report of
+the network (see `ReteMatcher.beta_sharing`).
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/beta_sharing.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+
+
+class Customer(Fact):
+    pass
+
+
+class Order(Fact):
+    pass
+
+
+class Line(Fact):
+    pass
+
+
+class Product(Fact):
+    pass
+
+
+def engine_class(rules):
+    def rhs(self, c, o, p):
+        pass
+
+    def rule(category):
+        return Rule(Customer(id=W('c')),
+                    Order(id=W('o'), customer=W('c')),
+                    Line(order=W('o'), product=W('p')),
+                    Product(id=W('p'), category=category))(rhs)
+
+    return type('Engine%d' % rules, (KnowledgeEngine, ),
+                {'category%d' % i: rule(i) for i in range(rules)})
+
+
+def facts(n, categories):
+    for i in range(n):
+        yield Customer(id=i)
+        yield Order(id=i, customer=i)
+        yield Product(id=i, category=i % categories)
+        yield Line(order=i, product=i)
+
+
+def main(rules=20, n=1000):
+    warnings.simplefilter('ignore')
+    ke = engine_class(rules)()
+    ke.reset()
+
+    begin = default_timer()
+    ke.declare_many(facts(n, rules))
+    elapsed = default_timer() - begin
+
+    report = ke.matcher.beta_sharing()
+    print("rules:           %d" % rules)
+    print("joins:           %d" % report.joins)
+    print("join nodes:      %d" % report.nodes)
+    print("sharing ratio:   %.2f" % (report.joins / report.nodes))
+    print("stored tokens:   %d" % report.tokens)
+    print("unshared tokens: %d" % report.unshared_tokens)
+    print("memory saved:    %.1f%%" % (
+        100 * (1 - report.tokens / report.unshared_tokens)))
+    print("declare time:    %.1f us/fact" % (elapsed / (4 * n) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark of fact declaration with the compiled matcher.
+
+Declares customers, orders, order lines and products matched by
+`rules` rules with literal tests, predicates and joins, with the
+interpreted `ReteMatcher` and with the `CompiledMatcher`. The garbage
+collector is disabled while declaring (as `timeit` does), otherwise
+its full collections of the growing network memories hide the
+difference.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/compiled.py
+
+"""
+from timeit import default_timer
+import gc
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W, P
+from pyknow.matchers import CompiledMatcher
+
+
+class Customer(Fact):
+    pass
+
+
+class Order(Fact):
+    pass
+
+
+class Line(Fact):
+    pass
+
+
+class Product(Fact):
+    pass
+
+
+def engine_class(rules, matcher=None):
+    def rhs(self, **kwargs):
+        pass
+
+    def rule(category):
+        return Rule(Customer(id=W('c'), country='es'),
+                    Order(id=W('o'), customer=W('c'),
+                          total=P(lambda t: t > 10)),
+                    Line(order=W('o'), product=W('p')),
+                    Product(id=W('p'), category=category))(rhs)
+
+    attrs = {'category%d' % i: rule(i) for i in range(rules)}
+    if matcher is not None:
+        attrs['__matcher__'] = matcher
+    return type('Engine%d' % rules, (KnowledgeEngine, ), attrs)
+
+
+def facts(n, categories):
+    for i in range(n):
+        yield Customer(id=i, country='es' if i % 2 else 'fr')
+        yield Order(id=i, customer=i, total=i % 20)
+        yield Product(id=i, category=i % categories)
+        yield Line(order=i, product=i)
+
+
+def declare(engine_class, rules, n):
+    ke = engine_class()
+    ke.reset()
+
+    gc.collect()
+    gc.disable()
+    try:
+        begin = default_timer()
+        ke.declare_many(facts(n, rules))
+        return (default_timer() - begin) / (4 * n)
+    finally:
+        gc.enable()
+
+
+def main(rules=20, sizes=(1000, 10000)):
+    warnings.simplefilter('ignore')
+    interpreted = engine_class(rules)
+    compiled = engine_class(rules, CompiledMatcher)
+
+    print("%10s %20s %20s %8s" % ("facts", "interpreted (us/f)",
+                                   "compiled (us/f)", "speedup"))
+    for n in sizes:
+        slow = declare(interpreted, rules, n)
+        fast = declare(compiled, rules, n)
+        print("%10d %20.1f %20.1f %8.2f" % (4 * n, slow * 1e6, fast * 1e6,
+                                            slow / fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark of bulk fact loading into a `KnowledgeEngine`.
+
+Compares declaring facts one by one (one agenda update per fact)
+against `KnowledgeEngine.declare_many` (one agenda update per load).
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/engine_bulk_load.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+
+
+class Item(Fact):
+    pass
+
+
+class Bulk(KnowledgeEngine):
+    @Rule(Item(value=W('value')))
+    def item(self, value):
+        pass
+
+
+def load_one_by_one(n):
+    ke = Bulk()
+    ke.reset()
+    for i in range(n):
+        ke.declare(Item(value=i))
+
+
+def load_many(n):
+    ke = Bulk()
+    ke.reset()
+    ke.declare_many(Item(value=i) for i in range(n))
+
+
+def timed(func, n):
+    begin = default_timer()
+    func(n)
+    return default_timer() - begin
+
+
+def main(sizes=(500, 1000, 2000, 4000)):
+    warnings.simplefilter('ignore')
+    print("%10s %15s %17s" % ("facts", "declare (s)", "declare_many (s)"))
+    for n in sizes:
+        print("%10d %15.3f %17.3f" % (n,
+                                      timed(load_one_by_one, n),
+                                      timed(load_many, n)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Memory benchmark of regular (dict based) facts vs `SchemaFact` facts.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/fact_memory.py [number of facts]
+
+"""
+import sys
+import tracemalloc
+
+from pyknow import Fact, SchemaFact
+
+
+class DictEvent(Fact):
+    pass
+
+
+class SchemaEvent(SchemaFact):
+    __slots__ = ('user', 'kind', 'amount')
+
+
+def measure(fact_class, n):
+    tracemalloc.start()
+    facts = [fact_class(user=i, kind='login', amount=i * 0.5)
+             for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del facts
+    return size
+
+
+def main(n=1000000):
+    print("%12s %12s %15s" % ("class", "MiB", "bytes/fact"))
+    for fact_class in (DictEvent, SchemaEvent):
+        size = measure(fact_class, n)
+        print("%12s %12.1f %15.1f" % (fact_class.__name__,
+                                      size / 2 ** 20,
+                                      size / n))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
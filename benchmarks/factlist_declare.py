@@ -0,0 +1,37 @@
+"""
+Benchmark of `FactList.declare` as the working memory grows.
+
+The time to declare a batch of facts must stay (roughly) the same no
+matter how many facts are already in the factlist.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/factlist_declare.py
+
+"""
+from timeit import default_timer
+
+from pyknow import Fact
+from pyknow.factlist import FactList
+
+
+BATCH = 10000
+
+
+def declare_batch(flist, start):
+    begin = default_timer()
+    for i in range(start, start + BATCH):
+        flist.declare(Fact(value=i))
+    return default_timer() - begin
+
+
+def main(total=200000):
+    flist = FactList()
+    print("%10s %15s" % ("facts", "usec/declare"))
+    for start in range(0, total, BATCH):
+        elapsed = declare_batch(flist, start)
+        print("%10d %15.3f" % (start + BATCH, elapsed / BATCH * 1e6))
+
+
+if __name__ == '__main__':
+    main()
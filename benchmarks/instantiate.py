@@ -0,0 +1,79 @@
+"""
+Benchmark of engine instantiation.
+
+The RETE network is built only for the first engine of each class, the
+next ones get a copy of it with empty memories. Compares the time to
+create an engine of a new class (network built) against the time to
+create another engine of the same class (network copied), for both
+matchers.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/instantiate.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W, P, NOT
+from pyknow.matchers import ReteMatcher, CompiledMatcher
+
+
+class Customer(Fact):
+    pass
+
+
+class Order(Fact):
+    pass
+
+
+class Line(Fact):
+    pass
+
+
+class Product(Fact):
+    pass
+
+
+def engine_class(rules, matcher):
+    def rhs(self, **kwargs):
+        pass
+
+    def rule(category):
+        return Rule(Customer(id=W('c'), country=category % 5),
+                    Order(id=W('o'), customer=W('c'),
+                          total=P(lambda t: t > category)),
+                    Line(order=W('o'), product=W('p')),
+                    Product(id=W('p'), category=category),
+                    NOT(Line(order=W('o'), returned=True)))(rhs)
+
+    attrs = {'category%d' % i: rule(i) for i in range(rules)}
+    attrs['__matcher__'] = matcher
+    return type('Engine%d' % rules, (KnowledgeEngine, ), attrs)
+
+
+def instantiate(engine_class, times):
+    begin = default_timer()
+    for _ in range(times):
+        engine_class()
+    return (default_timer() - begin) / times
+
+
+def main(rules=(10, 50), times=100):
+    warnings.simplefilter('ignore')
+    print("%10s %8s %16s %16s %8s" % ("matcher", "rules", "build (ms)",
+                                      "copy (ms)", "speedup"))
+    for matcher in (ReteMatcher, CompiledMatcher):
+        for n in rules:
+            build = sum(instantiate(engine_class(n, matcher), 1)
+                        for _ in range(5)) / 5
+            cached = engine_class(n, matcher)
+            cached()
+            copy = instantiate(cached, times)
+            print("%10s %8d %16.2f %16.2f %8.1f" % (
+                matcher.__name__[:-7], n, build * 1e3, copy * 1e3,
+                build / copy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of fact retraction with large beta memories.
+
+Each `Item` is joined with the `Tag` of the same key, so every declared
+pair leaves a token in the join memories, in the conflict set memory
+and an activation in the agenda. Then some items are retracted one by
+one. The memories are hashed, so the cost of each retraction should not
+depend on the number of tokens already stored.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/retract.py [TOKENS ...]
+
+The default sizes go up to 100000 tokens. Bigger ones can be given in
+the command line (``1000 1000000``), a million tokens needs several GB
+of memory and a few minutes to load.
+
+"""
+from timeit import default_timer
+import sys
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+
+
+class Item(Fact):
+    pass
+
+
+class Tag(Fact):
+    pass
+
+
+class Tagged(KnowledgeEngine):
+    @Rule(Item(key=W('key')),
+          Tag(key=W('key')))
+    def tagged(self, key):
+        pass
+
+
+def retract(tokens, retracts):
+    ke = Tagged()
+    ke.reset()
+    ke.declare_many(Tag(key=i) for i in range(tokens))
+    items = [Item(key=i) for i in range(tokens)]
+    ke.declare_many(items)
+
+    step = max(1, tokens // retracts)
+    begin = default_timer()
+    for item in items[::step][:retracts]:
+        ke.retract(item)
+    return (default_timer() - begin) / retracts
+
+
+def main(sizes=(1000, 10000, 100000), retracts=1000):
+    warnings.simplefilter('ignore')
+    print("%10s %20s" % ("tokens", "retract (us/fact)"))
+    for n in sizes:
+        print("%10d %20.1f" % (n, retract(n, retracts) * 1e6))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(sizes=[int(arg) for arg in sys.argv[1:]])
+    else:
+        main()
@@ -0,0 +1,61 @@
+"""
+Microbenchmark of the engine run loop.
+
+Measures the number of rules fired per second when the rules don't
+change the working memory, with all the watchers disabled (the
+default) and with all of them enabled (the log records are discarded).
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/run_loop.py
+
+"""
+from timeit import default_timer
+import logging
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+from pyknow import watchers
+
+
+class Item(Fact):
+    pass
+
+
+class Loop(KnowledgeEngine):
+    @Rule(Item(value=W('value')))
+    def item(self, value):
+        pass
+
+
+def fires_per_second(n):
+    ke = Loop()
+    ke.reset()
+    ke.declare_many(Item(value=i) for i in range(n))
+
+    begin = default_timer()
+    ke.run()
+    return n / (default_timer() - begin)
+
+
+def main(n=1000):
+    warnings.simplefilter('ignore')
+    print("%10s %15s" % ("watchers", "fires/s"))
+    print("%10s %15.0f" % ("off", fires_per_second(n)))
+
+    handler = logging.NullHandler()
+    for watcher in watchers.ALL:
+        watcher.addHandler(handler)
+        watcher.propagate = False
+    watchers.watch()
+    try:
+        print("%10s %15.0f" % ("on", fires_per_second(n)))
+    finally:
+        for watcher in watchers.ALL:
+            watcher.setLevel(logging.CRITICAL)
+            watcher.removeHandler(handler)
+            watcher.propagate = True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the per-fire cost of the conflict resolution strategies.
+
+All the strategies run the same ruleset over the same facts, with rules
+of different salience and specificity. The rules don't change the
+working memory, so the time measured is mostly the cost of building
+and consuming the agenda.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/strategies.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W, P
+from pyknow import strategies
+
+
+class Item(Fact):
+    pass
+
+
+class Workload(KnowledgeEngine):
+    @Rule(Item(value=W('value')))
+    def any_item(self, value):
+        pass
+
+    @Rule(Item(value=W('value'), kind='odd'))
+    def odd(self, value):
+        pass
+
+    @Rule(Item(value=P(lambda v: v % 3 == 0), kind='even'), salience=1)
+    def even_triple(self):
+        pass
+
+
+STRATEGIES = ['DepthStrategy', 'BreadthStrategy', 'LEXStrategy',
+              'MEAStrategy', 'SimplicityStrategy', 'ComplexityStrategy',
+              'RandomStrategy']
+
+
+def fire(strategy, n, steps):
+    class Engine(Workload):
+        __strategy__ = getattr(strategies, strategy)
+
+    ke = Engine()
+    ke.reset()
+    ke.declare_many(Item(value=i, kind='odd' if i % 2 else 'even')
+                    for i in range(n))
+
+    begin = default_timer()
+    ke.run(steps)
+    return (default_timer() - begin) / steps
+
+
+def main(n=5000, steps=5000):
+    warnings.simplefilter('ignore')
+    print("%20s %12s" % ("strategy", "us/fire"))
+    for strategy in STRATEGIES:
+        print("%20s %12.1f" % (strategy, fire(strategy, n, steps) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark of the tokens created while declaring facts.
+
+Counts the distinct token, data and context objects received by the
+activation routines of the nodes per declared fact, and the time needed
+to declare each fact (best of `repeat` runs). The routines are wrapped
+before building the engine, so each token object is counted once no
+matter how many nodes it goes through.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/tokens.py
+
+"""
+from functools import wraps
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W, P, NOT
+from pyknow.matchers.rete import abstract
+
+
+class Customer(Fact):
+    pass
+
+
+class Order(Fact):
+    pass
+
+
+class Payment(Fact):
+    pass
+
+
+class Billing(KnowledgeEngine):
+    @Rule(Customer(id=W('c')),
+          Order(customer=W('c'), id=W('o')),
+          NOT(Payment(order=W('o'))))
+    def unpaid(self, c, o):
+        pass
+
+    @Rule(Order(id=W('o'), total=P(lambda t: t > 50)))
+    def big(self, o):
+        pass
+
+
+def facts(n):
+    for i in range(n):
+        yield Customer(id=i)
+        yield Order(id=i, customer=i, total=i % 100)
+        if i % 2:
+            yield Payment(order=i)
+
+
+def subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from subclasses(subclass)
+
+
+class Counter:
+    """Wrap the node activation routines to record the received tokens."""
+    def __init__(self):
+        self.tokens = dict()
+        self.methods = [
+            (cls, name)
+            for base, names in ((abstract.OneInputNode, ('_activate', )),
+                                (abstract.TwoInputNode, ('_activate_left',
+                                                         '_activate_right')))
+            for cls in subclasses(base)
+            for name in names
+            if name in cls.__dict__]
+
+    def record(self, method):
+        @wraps(method)
+        def _wrapper(node, token):
+            self.tokens[id(token)] = token
+            return method(node, token)
+        return _wrapper
+
+    def __enter__(self):
+        self.originals = [(cls, name, getattr(cls, name))
+                          for cls, name in self.methods]
+        for cls, name, method in self.originals:
+            setattr(cls, name, self.record(method))
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, method in self.originals:
+            setattr(cls, name, method)
+
+    def count(self):
+        tokens = list(self.tokens.values())
+        return (len(tokens),
+                len({id(t.data) for t in tokens}),
+                len({id(t.context) for t in tokens}))
+
+
+def declare(n):
+    ke = Billing()
+    ke.reset()
+    batch = list(facts(n))
+
+    begin = default_timer()
+    ke.declare_many(batch)
+    return len(batch), default_timer() - begin
+
+
+def main(n=2000, repeat=3):
+    warnings.simplefilter('ignore')
+
+    with Counter() as counter:
+        declared, _ = declare(n)
+    tokens, data, contexts = counter.count()
+
+    elapsed = min(declare(n)[1] for _ in range(repeat))
+
+    print("%10s %10s %10s %14s" % ("tokens", "data", "contexts",
+                                   "us/fact"))
+    print("%10.2f %10.2f %10.2f %14.1f" % (tokens / declared,
+                                           data / declared,
+                                           contexts / declared,
+                                           elapsed / declared * 1e6))
+
+
+if __name__ == '__main__':
+    main()
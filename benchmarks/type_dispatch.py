@@ -0,0 +1,50 @@
+"""
+Benchmark of fact declaration in networks with many fact types.
+
+Builds an engine with one rule per fact type and declares facts of a
+single type. The root of the network dispatches each fact to the
+branches of its type, so the time per fact should not grow with the
+number of fact types.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/type_dispatch.py
+
+"""
+from timeit import default_timer
+import warnings
+
+from pyknow import KnowledgeEngine, Rule, Fact, W
+
+
+def engine_class(types):
+    fact_types = [type('Type%d' % i, (Fact, ), {}) for i in range(types)]
+
+    def rhs(self, value):
+        pass
+
+    rules = {'rule%d' % i: Rule(fact_type(value=W('value')))(rhs)
+             for i, fact_type in enumerate(fact_types)}
+    return type('Engine%d' % types, (KnowledgeEngine, ), rules), fact_types
+
+
+def declare(types, facts):
+    klass, fact_types = engine_class(types)
+    ke = klass()
+    ke.reset()
+
+    batch = [fact_types[0](value=i) for i in range(facts)]
+    begin = default_timer()
+    ke.declare_many(batch)
+    return (default_timer() - begin) / facts
+
+
+def main(sizes=(1, 10, 100, 300), facts=5000):
+    warnings.simplefilter('ignore')
+    print("%10s %18s" % ("types", "declare (us/fact)"))
+    for types in sizes:
+        print("%10d %18.1f" % (types, declare(types, facts) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-from .fact import Fact, InitialFact
-from .rule import Rule, AND, OR, NOT
+from .fact import Fact, InitialFact, SchemaFact
+from .rule import Rule, AND, OR, NOT, WINDOW
 
 from .rule import LiteralPCE as L
 from .rule import PredicatePCE as P
@@ -1,4 +1,3 @@
-from collections import deque
 import abc
 import logging
 
@@ -11,13 +10,17 @@ class Matcher(metaclass=abc.ABCMeta):
         self.engine = engine
 
     @abc.abstractmethod
-    def changes(self, adding=None, deleting=None):
+    def changes(self, adding=None, deleting=None, modifying=None):
         """
         Main interface with the matcher.
 
         Called by the knowledge engine when changes are made in the
         working memory and return a set of activations.
 
+        `modifying` is a list of `(old, new)` pairs of facts also
+        present in `deleting` and `adding`. Matchers can use it to
+        handle modifications faster, or ignore it.
+
         """
         pass
 
@@ -26,6 +29,18 @@ class Matcher(metaclass=abc.ABCMeta):
         """Reset the matcher memory."""
         pass
 
+    @property
+    def time_dependent(self):
+        """
+        Whether the activations can change with the time, without
+        changes in the working memory.
+
+        When `False` the engine only asks for changes after the working
+        memory is modified.
+
+        """
+        return False
+
 
 class Strategy(metaclass=abc.ABCMeta):
     def __init__(self, *args, **kwargs):
@@ -34,6 +49,14 @@ class Strategy(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
     def _update_agenda(self, agenda, added, removed):
+        """
+        Apply the changes to the agenda.
+
+        Implementations can update `agenda` in place (using its `add`
+        and `remove` methods) and return `None`, or return an iterable
+        with all the activations of the new agenda in execution order.
+
+        """
         pass
 
     def update_agenda(self, agenda, added, removed):
@@ -43,7 +66,7 @@ class Strategy(metaclass=abc.ABCMeta):
                     " <== %r: %s %s",
                     getattr(act.rule, '__name__', None),
                     ", ".join(str(f) for f in act.facts),
-                    "[EXECUTED]" if act not in agenda.activations else "")
+                    "[EXECUTED]" if act not in agenda else "")
 
             for act in added:
                 watchers.ACTIVATIONS.info(
@@ -52,6 +75,6 @@ class Strategy(metaclass=abc.ABCMeta):
                     ", ".join(str(f) for f in act.facts))
 
         # Resolve conflicts using the appropiate strategy.
-        new_activations = deque(self._update_agenda(agenda, added, removed))
-        if new_activations != agenda.activations:
+        new_activations = self._update_agenda(agenda, added, removed)
+        if new_activations is not None:
             agenda.activations = new_activations
@@ -13,6 +13,8 @@ class Activation:
     """
     Activation object
     """
+    __slots__ = ('rule', 'facts', 'first_key', '_context')
+
     def __init__(self, rule, facts, context=None):
         if not isinstance(rule, Rule):
             raise TypeError("Rule must be a Rule object")
@@ -24,11 +26,22 @@ class Activation:
 
         self.rule = rule
         self.facts = set(facts)
+        #: Context key of the fact matching the first pattern of the
+        #: rule, if known (see :meth:`first_fact`).
+        self.first_key = None
         if context is None:
             self.context = dict()
         else:
             self.context = context
 
+    @property
+    def context(self):
+        return self._context
+
+    @context.setter
+    def context(self, context):
+        self._context = context
+
     def __repr__(self):
         return "Activation(rule={}, facts={}, context={})".format(
             self.rule, self.facts, self.context)
@@ -45,3 +58,71 @@ class Activation:
         return hash((self.rule,
                      frozenset(self.facts),
                      frozenset(self.context.items())))
+
+    def materialize(self):
+        """Return the activation to be executed (itself)."""
+        return self
+
+    def first_fact(self):
+        """Return the fact matching the first pattern, or `None`."""
+        if self.first_key is None:
+            return None
+        else:
+            return self.context.get(self.first_key)
+
+
+class LazyActivation(Activation):
+    """
+    Lightweight activation created by the matcher.
+
+    It keeps references to the immutable facts and context of the
+    token that produced it. The context dictionary is only built when
+    accessed, and the validation is done by :meth:`materialize`, when
+    the activation is about to be executed.
+
+    Compares equal to (and has the same hash than) the `Activation`
+    with the same rule, facts and context.
+    """
+    __slots__ = ('_context_dict', '_hash')
+
+    def __init__(self, rule, facts, context, first_key=None):
+        """
+        Create the activation of `rule` with the `facts` (a frozenset)
+        and `context` (a frozenset of key/value pairs) of a token.
+
+        `first_key` is the context key of the fact matching the first
+        pattern of the rule, if known.
+
+        """
+        self.rule = rule
+        self.facts = facts
+        self.first_key = first_key
+        self._context = frozenset(kv for kv in context
+                                  if isinstance(kv[0], str))
+        self._context_dict = None
+        self._hash = None
+
+    @property
+    def context(self):
+        if self._context_dict is None:
+            self._context_dict = dict(self._context)
+        return self._context_dict
+
+    def __eq__(self, other):
+        if isinstance(other, LazyActivation):
+            return (self.facts == other.facts
+                    and self._context == other._context
+                    and self.rule == other.rule)
+        else:
+            return super().__eq__(other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.rule, self.facts, self._context))
+        return self._hash
+
+    def materialize(self):
+        """Return a validated `Activation` with a copy of the context."""
+        activation = Activation(self.rule, self.facts, dict(self._context))
+        activation.first_key = self.first_key
+        return activation
@@ -1,4 +1,75 @@
 from collections import deque
+from itertools import chain, count
+import heapq
+
+from pyknow.fact import Fact
+
+
+def _write_through(name):
+    """
+    Return a `deque` method `name` synchronizing the view with its
+    agenda before the call and writing the result back after it.
+
+    """
+    method = getattr(deque, name)
+
+    def _method(self, *args):
+        deque.clear(self)
+        deque.extend(self, self.agenda)
+        try:
+            return method(self, *args)
+        finally:
+            self.agenda.activations = self
+
+    _method.__name__ = name
+    _method.__doc__ = method.__doc__
+    return _method
+
+
+class AgendaActivations(deque):
+    """
+    Pending activations of an `Agenda`, in execution order.
+
+    Each mutating `deque` method first reloads the current content of
+    the agenda, applies the change and assigns the result back to
+    :attr:`Agenda.activations`, so the agenda executes the activations
+    in the new order. Each change costs O(n); strategies should use
+    :meth:`Agenda.add` and :meth:`Agenda.remove` instead.
+
+    """
+    def __init__(self, agenda):
+        super().__init__(agenda)
+        self.agenda = agenda
+
+    def __reduce__(self):
+        return deque, (list(self), )
+
+    def __add__(self, other):
+        return deque(self) + other
+
+    def __mul__(self, times):
+        return deque(self) * times
+
+    def copy(self):
+        """Return a plain `deque` with the activations."""
+        return deque(self)
+
+    __copy__ = copy
+
+    append = _write_through('append')
+    appendleft = _write_through('appendleft')
+    extend = _write_through('extend')
+    extendleft = _write_through('extendleft')
+    pop = _write_through('pop')
+    popleft = _write_through('popleft')
+    remove = _write_through('remove')
+    insert = _write_through('insert')
+    clear = _write_through('clear')
+    rotate = _write_through('rotate')
+    reverse = _write_through('reverse')
+    __setitem__ = _write_through('__setitem__')
+    __delitem__ = _write_through('__delitem__')
+    __iadd__ = _write_through('__iadd__')
 
 
 class Agenda:
@@ -10,9 +81,29 @@ class Agenda:
        Extracted from clips documentation: ``The agenda is a collection
        of activations which are those rules which match pattern entities``
 
+    Activations are grouped by the agenda group of their rules (``MAIN``
+    by default). Only the group on top of the focus stack is executed;
+    when it runs out of activations it is removed from the stack and the
+    next one gets the focus. ``MAIN`` is always at the bottom of the
+    stack.
+
+    Each group keeps its activations in a binary heap ordered by the key
+    given when they are added (lower keys are executed first). Removed
+    activations are only marked as such and skipped when they reach the
+    top of the heap, so adding, removing and getting the next activation
+    are all O(log n).
+
+    The pending activations are also indexed by the ids of their facts,
+    so the ones depending on a retracted fact can be removed without
+    scanning the agenda.
+
     """
+    MAIN = 'MAIN'
+
     def __init__(self):
-        self.activations = deque()
+        self._counter = count()
+        self.focus_stack = [self.MAIN]
+        self.clear()
 
     def __repr__(self):
         return "\n".join(
@@ -21,22 +112,208 @@ class Agenda:
                                            facts=act.facts)
             for idx, act in enumerate(self.activations))
 
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, activation):
+        return activation in self._entries
+
+    def __iter__(self):
+        """
+        Iterate over the pending activations in execution order.
+
+        The groups in the focus stack are iterated from the top, then
+        the rest of the groups.
+
+        """
+        groups = list(reversed(self.focus_stack))
+        groups.extend(sorted(set(self._heaps) - set(groups)))
+
+        entries = sorted(chain.from_iterable(self._entries.values()))
+        for group in groups:
+            for entry in entries:
+                if entry[3] == group:
+                    yield entry[2]
+
+    @property
+    def activations(self):
+        """
+        Pending activations, in execution order.
+
+        Returns an :class:`AgendaActivations` deque; adding, removing or
+        reordering its items writes the new content back to the agenda.
+        Assigning an iterable of activations replaces the agenda content
+        keeping the given order. The assigned activations are executed
+        before the ones added afterwards with :meth:`add`, whatever their
+        key.
+
+        """
+        return AgendaActivations(self)
+
+    @activations.setter
+    def activations(self, activations):
+        activations = list(activations)
+        self.clear()
+        for idx, activation in enumerate(activations):
+            self.add(activation, (float('-inf'), idx))
+
+    @property
+    def focus(self):
+        """The agenda group currently executed."""
+        return self.focus_stack[-1]
+
+    def set_focus(self, *groups):
+        """
+        Push the given agenda groups on the focus stack.
+
+        The first group ends on top of the stack. A group already
+        focused is not pushed again.
+
+        """
+        for group in reversed(groups):
+            if group != self.focus:
+                self.focus_stack.append(group)
+
+    def executable(self):
+        """
+        Number of pending activations of the groups in the focus stack.
+
+        Activations of groups out of the stack are not executed until
+        their group gets the focus.
+
+        """
+        return sum(len(self._heaps[group]) - self._removed[group]
+                   for group in set(self.focus_stack)
+                   if group in self._heaps)
+
+    def clear(self):
+        """Remove all the activations."""
+        self._heaps = dict()
+        self._removed = dict()
+        self._entries = dict()
+        self._by_fact = dict()
+        self._size = 0
+
+    @classmethod
+    def group_of(cls, activation):
+        """Return the agenda group of `activation`."""
+        rule = getattr(activation, 'rule', None)
+        return getattr(rule, 'agenda_group', cls.MAIN)
+
+    def add(self, activation, key):
+        """
+        Add `activation` to the agenda with the priority `key`.
+
+        Activations with lower keys are executed first, ties are broken
+        by insertion order.
+
+        """
+        group = self.group_of(activation)
+        entry = [key, next(self._counter), activation, group]
+        if activation not in self._entries:
+            self._entries[activation] = list()
+            for fact in getattr(activation, 'facts', ()):
+                self._by_fact.setdefault(fact.__factid__,
+                                         set()).add(activation)
+        self._entries[activation].append(entry)
+        self._size += 1
+
+        if group not in self._heaps:
+            self._heaps[group] = list()
+            self._removed[group] = 0
+        heapq.heappush(self._heaps[group], entry)
+
+    def remove(self, activation):
+        """
+        Remove `activation` from the agenda if present. If it was added
+        more than once only the last one is removed.
+
+        Return `True` if it was removed.
+
+        """
+        entries = self._entries.get(activation)
+        if entries is None:
+            return False
+        else:
+            entry = entries.pop()
+            if not entries:
+                self._forget(activation)
+            entry[2] = None
+            self._size -= 1
+
+            group = entry[3]
+            self._removed[group] += 1
+            if self._removed[group] * 2 > len(self._heaps[group]):
+                self._compact(group)
+            return True
+
+    def _forget(self, activation):
+        """Remove `activation` from the indexes."""
+        del self._entries[activation]
+        for fact in getattr(activation, 'facts', ()):
+            activations = self._by_fact[fact.__factid__]
+            activations.discard(activation)
+            if not activations:
+                del self._by_fact[fact.__factid__]
+
+    def _compact(self, group):
+        """Drop the removed entries from the heap of `group`."""
+        heap = [e for e in self._heaps[group] if e[2] is not None]
+        heapq.heapify(heap)
+        self._heaps[group] = heap
+        self._removed[group] = 0
+
+    def _pop(self, group):
+        """Pop the next activation of `group` or return None."""
+        heap = self._heaps.get(group)
+        while heap:
+            entry = heapq.heappop(heap)
+            activation = entry[2]
+            if activation is None:
+                self._removed[group] -= 1
+            else:
+                entries = self._entries[activation]
+                entries.remove(entry)
+                if not entries:
+                    self._forget(activation)
+                self._size -= 1
+                return activation
+        return None
+
     def get_next(self):
-        """Returns the next activation, removes it from activations list."""
+        """
+        Returns the next activation of the focused group, removes it
+        from activations list.
 
-        try:
-            return self.activations.popleft()
-        except IndexError:
-            return None
+        Empty groups lose the focus. Return `None` when there is
+        nothing left to execute in the focus stack.
+
+        """
+        while True:
+            activation = self._pop(self.focus)
+            if activation is not None:
+                return activation
+            elif len(self.focus_stack) > 1:
+                self.focus_stack.pop()
+            else:
+                return None
 
     def remove_from_fact(self, fact):
         """
-        Remove a matching activation against a specific fact
+        Remove all the activations depending on a specific fact.
+
+        `fact` is the index of a declared fact (or the declared fact
+        itself). Return the number of activations removed.
 
         """
-        activations_to_remove = []
-        for activation in self.activations:
-            if activation.facts == (fact,):
-                activations_to_remove.append(activation)
-        for activation in activations_to_remove:
-            self.activations.remove(activation)
+        if isinstance(fact, Fact):
+            fact = fact.__factid__
+
+        removed = 0
+        for activation in list(self._by_fact.get(fact, ())):
+            while self.remove(activation):
+                removed += 1
+        return removed
@@ -4,7 +4,9 @@
 """
 
 from inspect import getmembers
+from itertools import islice
 import logging
+import time
 import warnings
 
 from pyknow import abstract
@@ -31,8 +33,13 @@ class KnowledgeEngine:
     from pyknow.matchers import ReteMatcher as __matcher__
     from pyknow.strategies import DepthStrategy as __strategy__
 
+    #: Callable returning the current time, used for fact expiration.
+    clock = staticmethod(time.monotonic)
+
     def __init__(self):
         self._fixed_facts = []
+        self._fact_indexes = []
+        self._ttls = dict()
         self.running = False
         self.facts = FactList()
         self.agenda = Agenda()
@@ -58,6 +65,49 @@ class KnowledgeEngine:
 
         self._fixed_facts.extend(facts)
 
+    def add_index(self, fact_type, slot):
+        """
+        Add a secondary index over `slot` for `fact_type` facts.
+
+        The index is used by the factlist queries (``self.facts.find``,
+        ``find_all``, ``count`` and ``retract_all``) and survives
+        engine resets.
+        """
+        self._fact_indexes.append((fact_type, slot))
+        self.facts.add_index(fact_type, slot)
+
+    def set_ttl(self, fact_type, ttl):
+        """
+        Make the facts of `fact_type` expire `ttl` seconds (as measured
+        by :attr:`clock`) after being declared.
+
+        Use `None` to disable the expiration of this type of facts.
+        """
+        if ttl is None:
+            self._ttls.pop(fact_type, None)
+        else:
+            self._ttls[fact_type] = ttl
+
+    def expire(self):
+        """
+        Retract all the expired facts at once.
+
+        This is done automatically before each activation is executed
+        and before declaring new facts.
+
+        .. note::
+            This updates the agenda
+        """
+        self.__retract(*self.__expired())
+
+    def __expired(self):
+        """Return the indexes of the expired facts."""
+        deadline = self.facts.next_deadline
+        if deadline is None:
+            return []
+        else:
+            return self.facts.expired(self.clock())
+
     def load_initial_facts(self):
         """
         Declares all fixed_facts
@@ -77,13 +127,25 @@ class KnowledgeEngine:
         `modifiers` must be a Mapping object containing keys and values
         to be changed.
 
-        """
+        The matcher is told about the modification, so only the rules
+        depending on the changed slots are matched again.
 
-        self.retract(declared_fact)
+        """
 
         newfact = declared_fact.copy()
         newfact.update(modifiers)
-        self.declare(newfact)
+        self.__check_declarable(newfact)
+
+        if not self.running:
+            warnings.warn("Declaring fact while not run()")
+
+        idx = declared_fact['__factid__']
+        self.facts.modify(idx, newfact)
+        self.agenda.remove_from_fact(idx)
+
+        if not self.running:
+            added, removed = self.get_activations()
+            self.strategy.update_agenda(self.agenda, added, removed)
 
     def get_rules(self):
         """
@@ -104,13 +166,17 @@ class KnowledgeEngine:
         """
         return self.matcher.changes(*self.facts.changes)
 
-    def __retract(self, idx):
-        idx = self.facts.retract(idx)
-        self.agenda.remove_from_fact(idx)
+    def __retract(self, *idxs):
+        self.__remove(idxs)
         if not self.running:
             added, removed = self.get_activations()
             self.strategy.update_agenda(self.agenda, added, removed)
 
+    def __remove(self, idxs):
+        for idx in idxs:
+            idx = self.facts.retract(idx)
+            self.agenda.remove_from_fact(idx)
+
     def retract(self, declared_fact):
         """
         Retracts a specific fact, using its index
@@ -120,51 +186,138 @@ class KnowledgeEngine:
         """
         self.__retract(declared_fact['__factid__'])
 
+    def retract_many(self, declared_facts):
+        """
+        Retract all the given facts at once.
+
+        `declared_facts` can be any iterable (even a generator) of
+        declared facts. All the changes are passed to the matcher
+        together and the agenda is updated only once.
+
+        If any of the facts is not declared an `IndexError` is raised
+        and none of them is retracted.
+
+        .. note::
+            This updates the agenda
+        """
+        idxs = list(dict.fromkeys(f['__factid__'] for f in declared_facts))
+        missing = [idx for idx in idxs if idx not in self.facts.facts]
+        if missing:
+            raise IndexError("Facts not found: %r" % missing)
+        self.__retract(*idxs)
+
     def run(self, steps=float('inf')):
         """
         Execute agenda activations
         """
 
         self.running = True
+        self.__fire(steps)
+        self.running = False
+
+    def feed(self, facts, chunk_size=1000, max_pending=0):
+        """
+        Declare the facts of the iterable `facts` and run the engine.
+
+        Facts are pulled lazily from `facts` in chunks of `chunk_size`
+        and declared together. Between chunks the agenda is executed
+        until no more than `max_pending` activations of the groups in the
+        focus stack remain, and only then the next chunk is pulled. When
+        the iterable is exhausted the remaining activations are executed.
+
+        This keeps the memory used by the pending facts and activations
+        bounded for any length of input.
+
+        .. note::
+
+            If a rule calls :meth:`halt` no more facts are pulled.
+        """
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        facts = iter(facts)
+        self.running = True
+        while self.running:
+            chunk = list(islice(facts, chunk_size))
+            if not chunk:
+                self.__fire()
+                break
+            else:
+                self.__declare_many(chunk)
+                self.__fire(max_pending=max_pending)
+        self.running = False
+
+    def __fire(self, steps=float('inf'), max_pending=0):
+        """
+        Execute agenda activations while the engine is running.
+
+        Stops after `steps` executions or when no more than
+        `max_pending` activations of the focused groups are left in the
+        agenda.
+        """
         activation = None
         execution = 0
-        while steps > 0 and self.running:
 
-            added, removed = self.get_activations()
-            self.strategy.update_agenda(self.agenda, added, removed)
+        # Checked once per run, so disabled watchers cost nothing.
+        log_agenda = watchers.AGENDA.isEnabledFor(logging.DEBUG)
+        log_rules = watchers.RULES.isEnabledFor(logging.INFO)
+        time_dependent = self.matcher.time_dependent
+
+        while steps > 0 and self.running:
 
-            for idx, act in enumerate(self.agenda.activations):
-                watchers.AGENDA.debug(
-                    "%d: %r %r",
-                    idx,
-                    act.rule.__name__,
-                    ", ".join(str(f) for f in act.facts))
+            self.__remove(self.__expired())
+            if self.facts.has_changes or time_dependent:
+                added, removed = self.get_activations()
+                self.strategy.update_agenda(self.agenda, added, removed)
+
+            if log_agenda:
+                for idx, act in enumerate(self.agenda.activations):
+                    watchers.AGENDA.debug(
+                        "%d: %r %r",
+                        idx,
+                        act.rule.__name__,
+                        ", ".join(str(f) for f in act.facts))
+
+            if self.agenda.executable() <= max_pending:
+                # Activations of groups without focus are not counted.
+                break
 
             activation = self.agenda.get_next()
-
             if activation is None:
                 break
             else:
+                activation = activation.materialize()
                 steps -= 1
                 execution += 1
 
-                watchers.RULES.info(
-                    "FIRE %s %s: %s",
-                    execution,
-                    activation.rule.__name__,
-                    ", ".join(str(f) for f in activation.facts))
+                if log_rules:
+                    watchers.RULES.info(
+                        "FIRE %s %s: %s",
+                        execution,
+                        activation.rule.__name__,
+                        ", ".join(str(f) for f in activation.facts))
 
-                activation.rule(
-                    self,
-                    **{k: v
-                       for k, v in activation.context.items()
-                       if not k.startswith('__')})
-
-        self.running = False
+                arguments = activation.rule.get_arguments(activation.context)
+                if isinstance(arguments, tuple):
+                    activation.rule(self, *arguments)
+                else:
+                    activation.rule(self, **arguments)
 
     def halt(self):
         self.running = False
 
+    def focus(self, *groups):
+        """
+        Give the focus to the given agenda groups.
+
+        The groups are pushed on the focus stack, the first one on top.
+        Only the activations of the rules in the group on top of the
+        stack are executed, until the group has no more activations.
+
+        """
+        self.agenda.set_focus(*groups)
+
     def reset(self):
         """
         Performs a reset as per CLIPS behaviour (resets the
@@ -172,10 +325,13 @@ class KnowledgeEngine:
 
         .. note:: If persistent facts have been added, they'll be
                   re-declared.
+
+        .. note:: Secondary indexes added with :meth:`add_index` are
+                  kept.
         """
 
         self.agenda = Agenda()
-        self.facts = FactList()
+        self.facts = FactList(indexes=self._fact_indexes)
         self.matcher.reset()
         self.__declare(InitialFact())
         self.load_initial_facts()
@@ -185,21 +341,69 @@ class KnowledgeEngine:
         """
         Internal declaration method. Used for ``declare`` and ``deffacts``
         """
+        self.__declare_many(facts)
+
+    def __declare_many(self, facts, ttl=None):
+        """
+        Declare all the facts of the iterable `facts`.
+
+        The matcher and the agenda are updated once, after all the facts
+        have been added to the factlist.
+        """
+        self.__remove(self.__expired())
+
+        now = None
         for fact in facts:
-            if any(isinstance(v, ConditionalElement) for v in fact.values()):
-                raise TypeError(
-                    "Declared facts cannot contain conditional elements")
+            self.__check_declarable(fact)
+
+            fact_ttl = self._ttls.get(type(fact)) if ttl is None else ttl
+            if fact_ttl is None:
+                deadline = None
             else:
-                self.facts.declare(fact)
+                if now is None:
+                    now = self.clock()
+                deadline = now + fact_ttl
+
+            self.facts.declare(fact, deadline=deadline)
 
         if not self.running:
             added, removed = self.get_activations()
             self.strategy.update_agenda(self.agenda, added, removed)
 
-    def declare(self, *facts):
+    @staticmethod
+    def __check_declarable(fact):
+        if any(isinstance(v, ConditionalElement) for v in fact.values()):
+            raise TypeError(
+                "Declared facts cannot contain conditional elements")
+
+    def declare(self, *facts, ttl=None):
         """
         Declare from inside a fact, equivalent to ``assert`` in clips.
 
+        If `ttl` is given the facts expire after `ttl` seconds,
+        overriding the expiration set with :meth:`set_ttl`.
+
+        .. note::
+
+            This updates the agenda.
+        """
+
+        if not self.running:
+            warnings.warn("Declaring fact while not run()")
+        self.__declare_many(facts, ttl=ttl)
+
+    def declare_many(self, facts, ttl=None):
+        """
+        Declare all the facts of the iterable `facts`.
+
+        `facts` can be any iterable, generators are consumed lazily.
+        All the new facts are passed to the matcher together and the
+        agenda is updated only once, so bulk loads don't pay for a
+        conflict resolution per fact.
+
+        If `ttl` is given the facts expire after `ttl` seconds,
+        overriding the expiration set with :meth:`set_ttl`.
+
         .. note::
 
             This updates the agenda.
@@ -207,4 +411,4 @@ class KnowledgeEngine:
 
         if not self.running:
             warnings.warn("Declaring fact while not run()")
-        self.__declare(*facts)
+        self.__declare_many(facts, ttl=ttl)
@@ -18,6 +18,8 @@ class Fact(ComposableCE, Bindable, dict):
     Base Fact class
 
     """
+    __slots__ = ('_hash', )
+
     def __init__(self, *args, **kwargs):
         self.update(dict(chain(enumerate(args), kwargs.items())))
 
@@ -25,6 +27,51 @@ class Fact(ComposableCE, Bindable, dict):
         for k, v in mapping.items():
             self[k] = v
 
+    def freeze(self):
+        """
+        Make this fact immutable.
+
+        Called by :obj:`pyknow.factlist.FactList` when the fact is
+        declared. From now on any change to the content of the fact
+        raises a `TypeError` and its hash is computed only once.
+
+        """
+        if not self.frozen:
+            self._hash = hash(self.as_key())
+
+    @property
+    def frozen(self):
+        return hasattr(self, '_hash')
+
+    def _check_mutable(self):
+        if self.frozen:
+            raise TypeError("Declared facts are immutable, "
+                            "use `KnowledgeEngine.modify` instead.")
+
+    def __setitem__(self, key, value):
+        self._check_mutable()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._check_mutable()
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self._check_mutable()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._check_mutable()
+        return super().popitem()
+
+    def setdefault(self, *args):
+        self._check_mutable()
+        return super().setdefault(*args)
+
+    def clear(self):
+        self._check_mutable()
+        super().clear()
+
     @staticmethod
     def arg_to_ce(arg):
         if not isinstance(arg, PatternConditionalElement):
@@ -43,6 +90,19 @@ class Fact(ComposableCE, Bindable, dict):
                 and key.startswith('__')
                 and key.endswith('__'))
 
+    def as_key(self):
+        """
+        Return a hashable representation of this fact content.
+
+        Special keys (``__factid__``, ``__bind__``...) are not part of
+        the content, so two facts of the same class with the same
+        values have the same key.
+
+        """
+        return (self.__class__,
+                frozenset((k, v) for k, v in self.items()
+                          if not self.isspecial(k)))
+
     @property
     def __bind__(self):
         return self.get('__bind__', None)
@@ -83,14 +143,183 @@ class Fact(ComposableCE, Bindable, dict):
         try:
             return self._hash
         except AttributeError:
-            self._hash = hash(frozenset(self.items()))
-            return self._hash
+            return hash(self.as_key())
 
     def __eq__(self, other):
         return (self.__class__ == other.__class__
                 and super().__eq__(other))
 
 
+class SchemaFact(Fact):
+    """
+    Base class for facts with a fixed set of slots.
+
+    Subclasses declare their schema using ``__slots__``. The values are
+    stored in the instance slots instead of in the dictionary, so
+    this kind of facts use much less memory than regular ones.
+
+    .. code-block:: python
+
+       class Point(SchemaFact):
+           __slots__ = ('x', 'y')
+
+       Point(1, 2) == Point(x=1, y=2)
+
+    Positional arguments are assigned to the slots in schema order and
+    any key not present in the schema raises a `KeyError`. Unassigned
+    slots are not part of the fact (the same way a missing key is not
+    part of a regular fact), so partial facts can be used as patterns.
+
+    """
+    __slots__ = ('_factid', '_bind')
+
+    _specials = {'__factid__': '_factid', '__bind__': '_bind'}
+
+    @classmethod
+    def schema(cls):
+        """Return the tuple of slot names defined by this fact class."""
+        try:
+            return cls.__dict__['_schema']
+        except KeyError:
+            schema = list()
+            for klass in reversed(cls.__mro__):
+                if not issubclass(klass, SchemaFact) \
+                        or klass is SchemaFact:
+                    continue
+                slots = klass.__dict__.get('__slots__', ())
+                if isinstance(slots, str):
+                    slots = (slots, )
+                for slot in slots:
+                    if hasattr(Fact, slot) or slot.startswith('_'):
+                        raise TypeError(
+                            "Invalid slot name %r in %s" % (slot,
+                                                            cls.__name__))
+                    schema.append(slot)
+            cls._schema = tuple(schema)
+            return cls._schema
+
+    def _attr(self, key):
+        if isinstance(key, int):
+            try:
+                return self.schema()[key]
+            except IndexError:
+                pass
+        elif key in self._specials:
+            return self._specials[key]
+        elif key in self.schema():
+            return key
+
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._attr(key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        self._check_mutable()
+        setattr(self, self._attr(key), value)
+
+    def __delitem__(self, key):
+        self._check_mutable()
+        try:
+            delattr(self, self._attr(key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        try:
+            return hasattr(self, self._attr(key))
+        except (KeyError, TypeError):
+            return False
+
+    def keys(self):
+        return [k for k, _ in self.items()]
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    def items(self):
+        missing = object()
+        items = list()
+        for key in self.schema() + tuple(self._specials):
+            value = getattr(self, self._attr(key), missing)
+            if value is not missing:
+                items.append((key, value))
+        return items
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        self._check_mutable()
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def popitem(self):
+        self._check_mutable()
+        items = self.items()
+        if not items:
+            raise KeyError("popitem(): fact is empty")
+        key, value = items[-1]
+        del self[key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        self._check_mutable()
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def clear(self):
+        self._check_mutable()
+        for key in self.keys():
+            del self[key]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    @property
+    def __bind__(self):
+        return getattr(self, '_bind', None)
+
+    @__bind__.setter
+    def __bind__(self, value):
+        self._bind = value
+
+    @property
+    def __factid__(self):
+        return getattr(self, '_factid', None)
+
+    @__factid__.setter
+    def __factid__(self, value):
+        self._factid = value
+
+    def __eq__(self, other):
+        return (self.__class__ == other.__class__
+                and self.items() == other.items())
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = Fact.__hash__
+
+
 class InitialFact(Fact):
     """
     InitialFact
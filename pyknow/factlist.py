@@ -9,7 +9,9 @@ Also see `retrieving the fact-list \
           programming manual
 """
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+import heapq
+
 from pyknow.fact import Fact
 from pyknow import watchers
 
@@ -27,30 +29,44 @@ class FactList:
     implemented
     """
 
-    def __init__(self):
+    def __init__(self, indexes=None):
         self.facts = OrderedDict()
         self._ifacts = dict()
+        self._type_index = defaultdict(OrderedDict)
+        self._slot_indexes = defaultdict(dict)
         self.last_read = OrderedDict()
         self._fidx = 0
         self.added = list()
         self.removed = list()
+        self.modified = list()
+        self._deadlines = dict()
+        self._expirations = list()
+
+        if indexes is not None:
+            for fact_type, slot in indexes:
+                self.add_index(fact_type, slot)
 
     def __repr__(self):
         return "\n".join(
             "%s: %r" % (fact, fact)
             for idx, fact in self.facts.items())
 
-    def declare(self, fact):
+    def declare(self, fact, deadline=None):
         """
         Assert (in clips terminology) a fact.
 
         This keeps insertion order.
 
+        Once declared the fact is frozen (see
+        :meth:`pyknow.fact.Fact.freeze`).
+
         .. warning:: This will reject any object that not descend
                      from the Fact class.
 
         :param fact: The fact to declare, **must** be derived from
                      :obj:`pyknow.fact.Fact`.
+        :param deadline: If given, the time from which the fact is
+                         returned by :meth:`expired`.
         :return: (int) The index of the fact in the list.
         :throws ValueError: If the fact providen is not a Fact object
 
@@ -59,13 +75,21 @@ class FactList:
         if not isinstance(fact, Fact):
             raise ValueError('The fact must descend the Fact class.')
 
-        if fact not in self.facts.values():
-            # TODO: check now we have __factid__
+        key = fact.as_key()
+        if key not in self._ifacts:
             idx = self._fidx
             fact.__factid__ = idx
+            fact.freeze()
             self.facts[idx] = fact
-            self._ifacts[fact] = idx
+            self._ifacts[key] = idx
+            self._type_index[type(fact)][idx] = fact
+            for slot, index in self._slot_indexes[type(fact)].items():
+                if slot in fact:
+                    index[fact[slot]][idx] = fact
             self._fidx += 1
+            if deadline is not None:
+                self._deadlines[idx] = deadline
+                heapq.heappush(self._expirations, (deadline, idx))
             self.added.append(fact)
             watchers.FACTS.info(" ==> %s: %r", fact, fact)
             return idx
@@ -94,7 +118,14 @@ class FactList:
         self.removed.append(fact)
 
         del self.facts[idx]
-        del self._ifacts[fact]
+        self._deadlines.pop(idx, None)
+        del self._ifacts[fact.as_key()]
+        del self._type_index[type(fact)][idx]
+        for slot, index in self._slot_indexes[type(fact)].items():
+            if slot in fact:
+                del index[fact[slot]][idx]
+                if not index[fact[slot]]:
+                    del index[fact[slot]]
 
         return idx
 
@@ -105,35 +136,179 @@ class FactList:
         :return: list of indexes of the facts retracted
         :throws ValueError: If no fact matches in the factlist
         """
+        return [self.retract(self.index(fact))]
 
-        def search_matching(model_fact):
-            model_fact_set = set(model_fact.items())
+    def index(self, fact):
+        """
+        Return the index of the declared fact with the same content.
 
-            for fact in self.facts.values():
-                this_fact_set = {(k, v)
-                                 for k, v in fact.items()
-                                 if not (isinstance(k, str)
-                                         and k.startswith('__')
-                                         and k.endswith('__'))}
-                if model_fact_set == this_fact_set:
-                    yield fact.__factid__
+        The lookup is made by value (see :meth:`pyknow.fact.Fact.as_key`)
+        against the factlist hash index, so it doesn't depend on the
+        number of declared facts.
 
-        retracted = [self.retract(f) for f in search_matching(fact)]
-        if retracted:
-            return retracted
-        else:
-            raise ValueError("No matching fact.")
+        :return: (int) The index of the matching fact
+        :throws ValueError: If no fact matches in the factlist
+        """
+        try:
+            return self._ifacts[fact.as_key()]
+        except KeyError:
+            raise ValueError("No matching fact.") from None
+
+    def __contains__(self, fact):
+        return fact.as_key() in self._ifacts
+
+    @property
+    def indexes(self):
+        """Return a list of the `(fact_type, slot)` secondary indexes."""
+        return [(fact_type, slot)
+                for fact_type, slots in self._slot_indexes.items()
+                for slot in slots]
+
+    def add_index(self, fact_type, slot):
+        """
+        Maintain a secondary index over `slot` for facts of `fact_type`.
+
+        Queries (:meth:`find`, :meth:`find_all`, :meth:`count` and
+        :meth:`retract_all`) with a model fact of `fact_type` defining
+        `slot` will only look at the facts with the same value in it.
+
+        Already declared facts are added to the new index.
+
+        """
+        if slot in self._slot_indexes[fact_type]:
+            return
+
+        index = defaultdict(OrderedDict)
+        for idx, fact in self._type_index[fact_type].items():
+            if slot in fact:
+                index[fact[slot]][idx] = fact
+
+        self._slot_indexes[fact_type][slot] = index
+
+    def _query(self, model):
+        """
+        Generate the declared facts matching the given model fact.
+
+        A fact matches if it is of the same type as the model and has
+        the same values in all the (non special) slots of the model.
+
+        """
+        fact_type = type(model)
+        if fact_type not in self._type_index:
+            return
+
+        conditions = [(k, v) for k, v in model.items()
+                      if not model.isspecial(k)]
+
+        candidates = self._type_index[fact_type]
+        slot_indexes = self._slot_indexes.get(fact_type, {})
+        for slot, value in conditions:
+            if slot in slot_indexes:
+                indexed = slot_indexes[slot].get(value, {})
+                if len(indexed) < len(candidates):
+                    candidates = indexed
+
+        missing = object()
+        for fact in candidates.values():
+            if all(fact.get(k, missing) == v for k, v in conditions):
+                yield fact
+
+    def find(self, model):
+        """
+        Return the first declared fact matching `model` or None.
+
+        :param model: A fact with the slots and values to look for.
+        """
+        return next(self._query(model), None)
+
+    def find_all(self, model):
+        """
+        Return a list of the declared facts matching `model`.
+
+        :param model: A fact with the slots and values to look for.
+        """
+        return list(self._query(model))
+
+    def count(self, model):
+        """
+        Return the number of declared facts matching `model`.
+
+        :param model: A fact with the slots and values to look for.
+        """
+        return sum(1 for _ in self._query(model))
+
+    def retract_all(self, model):
+        """
+        Retract all the declared facts matching `model`.
+
+        :param model: A fact with the slots and values to look for.
+        :return: list of indexes of the facts retracted
+        """
+        return [self.retract(fact.__factid__)
+                for fact in self.find_all(model)]
+
+    def modify(self, idx, fact):
+        """
+        Retract the fact with index `idx` and declare `fact` instead.
+
+        The pair of facts is recorded as a modification so the matcher
+        can handle it as such. The new fact keeps the deadline of the
+        old one.
+
+        :return: (int) The index of the new fact, or None if it was
+                 already declared.
+        """
+        old = self.facts.get(idx)
+        deadline = self._deadlines.get(idx)
+        self.retract(idx)
+        newidx = self.declare(fact, deadline=deadline)
+        if newidx is not None:
+            self.modified.append((old, fact))
+        return newidx
+
+    @property
+    def next_deadline(self):
+        """Return the earliest deadline of the declared facts or None."""
+        while self._expirations:
+            deadline, idx = self._expirations[0]
+            if self._deadlines.get(idx) == deadline:
+                return deadline
+            else:
+                # Already retracted
+                heapq.heappop(self._expirations)
+        return None
+
+    def expired(self, now):
+        """
+        Return the list of indexes of the facts expired at time `now`.
+
+        The facts are not retracted, but they are not returned again.
+        """
+        expired = list()
+        while self._expirations and self._expirations[0][0] <= now:
+            deadline, idx = heapq.heappop(self._expirations)
+            if self._deadlines.get(idx) == deadline:
+                del self._deadlines[idx]
+                expired.append(idx)
+        return expired
+
+    @property
+    def has_changes(self):
+        """Whether there are changes not yet retrieved with `changes`."""
+        return bool(self.added or self.removed)
 
     @property
     def changes(self):
         """
-        Return a tuple with the removed and added facts since last run.
+        Return a tuple with the added, removed and modified facts since
+        last run.
         """
         try:
-            return self.added, self.removed
+            return self.added, self.removed, self.modified
         finally:
             self.added = list()
             self.removed = list()
+            self.modified = list()
 
     def __getitem__(self, item):
         return self.facts[item]
@@ -1 +1,2 @@
 from .rete import ReteMatcher
+from .compiled import CompiledMatcher
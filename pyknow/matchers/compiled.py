@@ -0,0 +1,544 @@
+"""
+Compiled RETE matcher.
+
+`CompiledMatcher` builds the same network as
+:class:`pyknow.matchers.rete.ReteMatcher` and then translates it to
+Python source code specialized for the rules of the engine, loaded with
+`compile()` and `exec`:
+
+- The alpha network becomes a function per fact type with the slot
+  tests inlined (literals, predicates and wildcards), the variable
+  bindings kept in local variables and the literal tests hashed by
+  value.
+
+- Each join (`OrdinaryMatchNode`) becomes a pair of functions (left and
+  right activation) comparing only the variables not already granted
+  by the hash index of its memories, and calling the next joins and the
+  conflict set nodes directly.
+
+The generated code uses the memories of the network nodes, so the rest
+of the nodes (negations, windows, tests...) and the modification of
+facts keep working through the interpreted network.
+
+The generated code doesn't report the single tests to the ``MATCH``
+watcher. The source is kept in the `source` attribute of the matcher.
+
+"""
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MethodType
+
+from pyknow.matchers.rete import ReteMatcher
+from pyknow.matchers.rete.abstract import Node
+from pyknow.matchers.rete.check import FactCapture, FeatureCheck
+from pyknow.matchers.rete.check import SameContextCheck, TypeCheck
+from pyknow.matchers.rete.nodes import BusNode, ConflictSetNode
+from pyknow.matchers.rete.nodes import FeatureTesterNode, NotNode
+from pyknow.matchers.rete.nodes import OrdinaryMatchNode, WhereNode
+from pyknow.matchers.rete.token import Context, Token, TokenInfo
+from pyknow.rule import LiteralPCE, PredicatePCE, WildcardPCE
+
+
+#: Placeholder of the slots missing in a fact.
+MISSING = object()
+
+
+def merge(context, match):
+    """
+    Add the result of a check to `context` as `FeatureTesterNode` does.
+
+    Return the new context or `None` if the check result contradicts
+    some of the variables already bound.
+
+    """
+    if not isinstance(match, Mapping):
+        return context
+
+    for key, value in match.items():
+        if isinstance(key, tuple):  # Negated condition
+            if key[1] in context and context[key[1]] == value:
+                return None
+        else:
+            if context.get(key, value) != value:
+                return None
+            if (False, key) in context \
+                    and context[(False, key)] == value:
+                return None
+
+    newcontext = dict(context)
+    newcontext.update(match)
+    return newcontext
+
+
+def compatible(context, key, value):
+    """Return whether `key` can be bound to `value` in `context`."""
+    return merge(context, {key: value}) is not None
+
+
+class _Scope:
+    """
+    Variables bound at some point of the alpha network.
+
+    `base` is the name of a variable holding a context dictionary (or
+    `None`) and `static` maps the names bound since then to the
+    expressions holding their values. `keys` is the set of all the keys
+    of the context if known at compile time, or `None`.
+
+    """
+    def __init__(self, base=None, base_keys=frozenset(), static=None):
+        self.base = base
+        self.base_keys = base_keys
+        self.static = OrderedDict() if static is None else static
+
+    @property
+    def keys(self):
+        if self.base_keys is None:
+            return None
+        else:
+            return frozenset(self.base_keys) | frozenset(self.static)
+
+    def bind(self, key, expr):
+        static = OrderedDict(self.static)
+        static[key] = expr
+        return _Scope(self.base, self.base_keys, static)
+
+    def context(self):
+        """Return an expression building the context dictionary."""
+        pairs = ", ".join("%r: %s" % kv for kv in self.static.items())
+        if self.base is None:
+            return "{%s}" % pairs
+        elif not self.static:
+            return self.base
+        else:
+            return "{**%s, %s}" % (self.base, pairs)
+
+
+class NetworkCompiler:
+    """Generate the Python source of a RETE network."""
+
+    def __init__(self, root_node):
+        self.root_node = root_node
+        self.namespace = {'MISSING': MISSING,
+                          'VALID': Token.TagType.VALID,
+                          'Token': Token,
+                          'Context': Context,
+                          'TokenInfo': TokenInfo,
+                          'merge': merge,
+                          'compatible': compatible}
+        self.names = dict()
+        self.counter = 0
+        self.functions = list()
+        self.tables = list()
+        self.alpha_keys = dict()
+        self.parents = dict()
+
+    def name(self, obj, prefix):
+        """Add `obj` to the namespace and return its name."""
+        key = (prefix, id(obj))
+        if key not in self.names:
+            self.names[key] = "%s%d" % (prefix, len(self.names))
+            self.namespace[self.names[key]] = obj
+        return self.names[key]
+
+    def variable(self, prefix):
+        self.counter += 1
+        return "%s%d" % (prefix, self.counter)
+
+    def compile(self):
+        """Return the source code and the namespace to execute it."""
+        self._find_parents()
+
+        types = {fact_type: self._type_function(nodes)
+                 for fact_type, nodes in self.root_node.by_type.items()}
+        self.tables.append(("TYPES", {self.name(fact_type, 'type'): name
+                                      for fact_type, name in types.items()}))
+
+        lines = ["def alpha(fact, tag):",
+                 "    data = frozenset((fact, ))",
+                 "    function = TYPES.get(type(fact))",
+                 "    if function is not None:",
+                 "        function(fact, data, tag)"]
+        if self.root_node.untyped:
+            lines.append("    token = Token.build(tag, data, Context())")
+            for child in self.root_node.untyped:
+                lines.append("    %s(token)" % self.name(child.callback,
+                                                         'cb'))
+        self.functions.append(lines)
+
+        # The beta functions are generated after the alpha network, once
+        # the context keys of the alpha terminals are known.
+        for node in self._beta_nodes():
+            if isinstance(node, OrdinaryMatchNode):
+                self._join_function(node, is_left=True)
+                self._join_function(node, is_left=False)
+            else:
+                self._conflict_set_function(node)
+
+        # The dispatch tables refer to the functions, so they go last.
+        tables = ["%s = {%s}" % (name, ", ".join(
+            "%s: %s" % kv for kv in table.items()))
+            for name, table in self.tables]
+
+        source = "\n\n\n".join("\n".join(f) for f in self.functions)
+        return source + "\n\n\n" + "\n".join(tables) + "\n", self.namespace
+
+    def _find_parents(self):
+        pending = [self.root_node]
+        seen = set()
+        while pending:
+            node = pending.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            for child in node.children:
+                side = child.callback.__name__
+                self.parents.setdefault((child.node, side), []).append(node)
+                pending.append(child.node)
+        self.nodes = seen
+
+    def _beta_nodes(self):
+        return [node for node in self.nodes
+                if isinstance(node, (OrdinaryMatchNode, ConflictSetNode))]
+
+    @staticmethod
+    def _compiled(child):
+        return isinstance(child.node, (OrdinaryMatchNode, ConflictSetNode))
+
+    def _call(self, child, data, context, info):
+        """Return the code of the call to a compiled beta node."""
+        node = child.node
+        if isinstance(node, ConflictSetNode):
+            function = self.name(node, 's')
+        elif child.callback.__name__ == 'activate_left':
+            function = self.name(node, 'jl')
+        else:
+            function = self.name(node, 'jr')
+        return "%s(tag, %s, %s, %s)" % (function, data, context, info)
+
+    def _send(self, children, data, context, indent):
+        """Return the lines sending a token to the beta `children`."""
+        lines = list()
+        token = info = None
+        for child in children:
+            if self._compiled(child):
+                if info is None:
+                    info = self.variable('info')
+                    lines.append("%s = TokenInfo(%s, %s)"
+                                 % (info, data, context))
+                lines.append(self._call(child, data, context, info))
+            else:
+                if token is None:
+                    token = self.variable('token')
+                    lines.append("%s = Token.build(tag, %s, Context(%s))"
+                                 % (token, data, context))
+                lines.append("%s(%s)" % (self.name(child.callback, 'cb'),
+                                         token))
+        return [indent + line for line in lines]
+
+    #
+    # Alpha network
+    #
+    def _type_function(self, nodes):
+        name = self.variable('alpha_type')
+        lines = ["def %s(fact, data, tag):" % name]
+        body = list()
+        for node in nodes:
+            body.extend(self._children(node, _Scope(), "    "))
+        self.functions.append(lines + (body or ["    pass"]))
+        return name
+
+    def _children(self, node, scope, indent):
+        """Return the lines sending the fact to the children of `node`."""
+        lines = list()
+
+        for slot, branches in node.by_value.items():
+            table = self.variable('table')
+            self.tables.append((table, {
+                self.name(value, 'literal'):
+                self._group_function(children, scope.keys)
+                for value, children in branches.items()}))
+            value = self.variable('value')
+            function = self.variable('group')
+            lines.extend([
+                "%s = fact.get(%r, MISSING)" % (value, slot),
+                "if %s is not MISSING:" % value,
+                "    try:",
+                "        %s = %s.get(%s)" % (function, table, value),
+                "    except TypeError:",
+                "        %s = None" % function,
+                "    if %s is not None:" % function,
+                "        %s(fact, data, tag, %s)" % (function,
+                                                     scope.context())])
+
+        context = None
+        for child in node.unhashed:
+            if isinstance(child.node, FeatureTesterNode):
+                lines.extend(self._node(child.node, scope, ""))
+            else:
+                self.alpha_keys[node] = scope.keys
+                if context is None:
+                    context = scope.context()
+                    if context != scope.base:
+                        name = self.variable('context')
+                        lines.append("%s = %s" % (name, context))
+                        context = name
+                lines.extend(self._send([child], "data", context, ""))
+
+        return [indent + line for line in lines]
+
+    def _group_function(self, children, keys):
+        name = self.variable('alpha_group')
+        lines = ["def %s(fact, data, tag, context):" % name]
+        scope = _Scope('context', keys)
+        for child in children:
+            lines.extend(self._node(child.node, scope, "    "))
+        self.functions.append(lines)
+        return name
+
+    def _node(self, node, scope, indent):
+        """Return the lines testing the fact in `node` and below."""
+        test, scope = self._test(node.matcher, scope)
+        lines = list()
+        inner = ""
+        for line in test:
+            if line.endswith(":"):
+                lines.append(inner + line)
+                inner += "    "
+            else:
+                lines.append(inner + line)
+        children = self._children(node, scope, inner)
+        lines.extend(children or [inner + "pass"])
+        return [indent + line for line in lines]
+
+    def _bind(self, scope, key, expr):
+        """Return the lines checking a new binding and the new scope."""
+        if key in scope.static:
+            return (["if %s == %s:" % (scope.static[key], expr)], scope)
+        elif scope.base is None:
+            return ([], scope.bind(key, expr))
+        elif scope.base_keys is not None and key in scope.base_keys:
+            return (["if %s[%r] == %s:" % (scope.base, key, expr)], scope)
+        elif scope.base_keys is not None:
+            return ([], scope.bind(key, expr))
+        else:
+            return (["if compatible(%s, %r, %s):" % (scope.base, key, expr)],
+                    scope.bind(key, expr))
+
+    def _test(self, check, scope):
+        """
+        Return the lines of the test `check` (each one opening a block)
+        and the scope inside the blocks.
+
+        """
+        if isinstance(check, FeatureCheck) \
+                and type(check.how) in (LiteralPCE, PredicatePCE,
+                                        WildcardPCE):
+            value = self.variable('value')
+            lines = ["%s = fact.get(%r, MISSING)" % (value, check.what)]
+            how = check.how
+            if isinstance(how, LiteralPCE):
+                lines.append("if %s is not MISSING and %s == %s:" % (
+                    value, self.name(how.value, 'literal'), value))
+            elif isinstance(how, PredicatePCE):
+                lines.append("if %s is not MISSING and %s(%s):" % (
+                    value, self.name(how.match, 'predicate'), value))
+            else:
+                lines.append("if %s is not MISSING:" % value)
+
+            if how.__bind__ is not None:
+                bind, scope = self._bind(scope, how.__bind__, value)
+                lines.extend(bind)
+            return lines, scope
+
+        elif isinstance(check, FactCapture):
+            return self._bind(scope, check.bind, "fact")
+
+        elif isinstance(check, TypeCheck):
+            fact_type = self.name(check.fact_type, 'type')
+            return (["if type(fact) == %s:" % fact_type], scope)
+
+        else:
+            result = self.variable('result')
+            context = self.variable('context')
+            return (["%s = %s(fact)" % (result, self.name(check, 'check')),
+                     "if %s:" % result,
+                     "%s = merge(%s, %s)" % (context, scope.context(),
+                                             result),
+                     "if %s is not None:" % context],
+                    _Scope(context, None))
+
+    #
+    # Beta network
+    #
+    def _keys(self, node):
+        """
+        Return the set of context keys of the tokens `node` sends to its
+        children, or `None` if unknown at compile time.
+
+        """
+        if isinstance(node, BusNode):
+            return frozenset()
+        elif isinstance(node, FeatureTesterNode):
+            return self.alpha_keys.get(node)
+        elif isinstance(node, OrdinaryMatchNode):
+            left = self._input_keys(node, 'activate_left')
+            right = self._input_keys(node, 'activate_right')
+            if left is None or right is None:
+                return None
+            else:
+                return left | right
+        elif isinstance(node, NotNode):
+            return self._input_keys(node, 'activate_left')
+        elif isinstance(node, WhereNode):
+            return self._input_keys(node, 'activate')
+        else:
+            return None
+
+    def _input_keys(self, node, side):
+        parents = self.parents.get((node, side), [])
+        if len(parents) != 1:
+            return None
+        keys = self._keys(parents[0])
+        if keys is None or any(isinstance(k, tuple) for k in keys):
+            return None
+        return keys
+
+    def _join_function(self, node, is_left):
+        if is_left:
+            name = self.name(node, 'jl')
+            memory, other = 'left_memory', 'right_memory'
+        else:
+            name = self.name(node, 'jr')
+            memory, other = 'right_memory', 'left_memory'
+
+        left = self._input_keys(node, 'activate_left')
+        right = self._input_keys(node, 'activate_right')
+        static = (isinstance(node.matcher, SameContextCheck)
+                  and left is not None and right is not None)
+
+        this = self.name(node, 'node')
+        keys = set(node.keys)
+        indexed = static and keys <= left & right
+        if indexed:
+            # The context binds the index keys, so the partition key is
+            # computed here instead of in the memories.
+            key = "".join("context[%r], " % k for k in node.keys)
+            suffix, argument = "_keyed", "key"
+            lines = ["def %s(tag, data, context, info):" % name,
+                     "    key = (%s)" % key.rstrip(" ")]
+        else:
+            suffix, argument = "", "context"
+            lines = ["def %s(tag, data, context, info):" % name]
+
+        lines.extend([
+            "    if tag is VALID:",
+            "        %s.%s.append%s(info, %s)" % (
+                this, memory, suffix, argument),
+            "    else:",
+            "        try:",
+            "            %s.%s.remove%s(info, %s)" % (
+                this, memory, suffix, argument),
+            "        except ValueError:",
+            "            pass",
+            "    for other_data, other_context in \\",
+            "            %s.%s.candidates%s(%s):" % (
+                this, other, suffix, argument)])
+
+        if static:
+            shared = left & right
+            if indexed:
+                shared -= keys
+            if shared:
+                # The memories keep the contexts as frozensets of pairs.
+                lines.append("        other = dict(other_context)")
+            for key in sorted(shared):
+                lines.append("        if context[%r] != other[%r]:"
+                             % (key, key))
+                lines.append("            continue")
+            lines.extend(["        newcontext = dict(context)",
+                          "        newcontext.update(other_context)"])
+        else:
+            lines.append("        other = dict(other_context)")
+            if is_left:
+                test = "%s(context, other)"
+            else:
+                test = "%s(other, context)"
+            lines.extend([
+                "        if not %s:" % (test % self.name(node.matcher,
+                                                         'matcher')),
+                "            continue",
+                "        newcontext = {k: v for k, v in context.items()",
+                "                      if isinstance(k, str)}",
+                "        newcontext.update(",
+                "            (k, v) for k, v in other.items()",
+                "            if not isinstance(k, tuple))"])
+
+        lines.append("        newdata = data | other_data")
+        lines.extend(self._send(node.children, "newdata", "newcontext",
+                                "        ") or ["        pass"])
+        self.functions.append(lines)
+
+    def _conflict_set_function(self, node):
+        this = self.name(node, 'node')
+        self.functions.append([
+            "def %s(tag, data, context, info):" % self.name(node, 's'),
+            "    if tag is VALID:",
+            "        %s._add(info)" % this,
+            "    else:",
+            "        %s._remove(info)" % this])
+
+
+class CompiledMatcher(ReteMatcher):
+    """
+    RETE matcher running the network as generated Python code.
+
+    Use it as the `__matcher__` of an engine::
+
+        from pyknow.matchers import CompiledMatcher
+
+        class MyEngine(KnowledgeEngine):
+            __matcher__ = CompiledMatcher
+
+    """
+    def build_network(self):
+        super().build_network()
+        self.source, self._names = NetworkCompiler(self.root_node).compile()
+        self._code = compile(self.source,
+                             "<%s %s>" % (self.__class__.__name__,
+                                          self.engine.__class__.__name__),
+                             'exec')
+        self._load(self._names)
+
+    def load_network(self, matcher):
+        """
+        Use a copy of the network of `matcher`, reusing its generated
+        code (only the nodes it refers to change).
+
+        """
+        memo = super().load_network(matcher)
+        self.source, self._code = matcher.source, matcher._code
+
+        def translate(value):
+            if isinstance(value, Node):
+                return memo[value]
+            elif isinstance(value, MethodType) \
+                    and isinstance(value.__self__, Node):
+                return getattr(memo[value.__self__], value.__name__)
+            else:
+                return value
+
+        self._names = {name: translate(value)
+                       for name, value in matcher._names.items()}
+        self._load(self._names)
+        return memo
+
+    def _load(self, names):
+        namespace = dict(names)
+        exec(self._code, namespace)
+        self._alpha = namespace['alpha']
+
+    def _add_fact(self, fact):
+        self._alpha(fact, Token.TagType.VALID)
+
+    def _remove_fact(self, fact):
+        self._alpha(fact, Token.TagType.INVALID)
@@ -8,78 +8,353 @@ a more pythonic approach.
 .. _paper: http://reports-archive.adm.cs.cmu.edu/anon/scan/CMU-CS-79-forgy.pdf
 
 """
-from functools import lru_cache
+from inspect import getmembers
 from itertools import chain
-from collections import Counter
+from collections import Counter, defaultdict, namedtuple
+from weakref import WeakKeyDictionary
 
+from .abstract import Node
 from .check import TypeCheck, FactCapture, FeatureCheck
-from .nodes import BusNode, ConflictSetNode, FeatureTesterNode
+from .nodes import BusNode, ConflictSetNode, FeatureTesterNode, WindowNode
+from .nodes import NotNode, OrdinaryMatchNode
+from .token import Token
 from .utils import prepare_rule, extract_facts, generate_checks, wire_rule
 from pyknow import OR
+from pyknow.rule import Rule
 from pyknow.abstract import Matcher
+from pyknow.watchers import MATCHER
+
+
+#: Join sharing report of a network, see `ReteMatcher.beta_sharing`.
+BetaSharing = namedtuple('BetaSharing',
+                         ['joins', 'nodes', 'tokens', 'unshared_tokens'])
 
 
 class ReteMatcher(Matcher):
-    """RETE algorithm with `pyknow` matcher interface."""
+    """
+    RETE algorithm with `pyknow` matcher interface.
+
+    The network is built from the rules of the engine class only for
+    the first engine of each class, the rest of the engines of that
+    class get a copy of it with empty memories (see
+    :meth:`load_network`). Engines with rules set on the instance get
+    their own network, built from all their rules.
+
+    """
+
+    #: Engine class -> matcher class -> network template
+    _networks = WeakKeyDictionary()
 
     def __init__(self, *args, **kwargs):
         """Create the RETE network for `self.engine`."""
         super().__init__(*args, **kwargs)
-        self.root_node = BusNode()
-        self.build_network()
-
-    @lru_cache(maxsize=1)
-    def _get_conflict_set_nodes(self):
+        self.saved_activations = 0
+        self._node_cache = dict()
+
+        if self.has_instance_rules(self.engine):
+            self.root_node = BusNode()
+            self.build_network()
+            return
+
+        templates = self._networks.setdefault(type(self.engine), dict())
+        template = templates.get(type(self))
+        if template is None:
+            self.root_node = BusNode()
+            self.build_network()
+            template = object.__new__(type(self))
+            template.load_network(self)
+            templates[type(self)] = template
+        else:
+            self.load_network(template)
+
+    def _get_nodes(self, node_type):
         nodes = list()
+        seen = set()
 
-        def _get_csn(node):
-            if isinstance(node, ConflictSetNode):
-                yield node
-            for child in node.children:
-                yield from _get_csn(child.node)
-
-        for node in _get_csn(self.root_node):
-            if node not in nodes:
-                nodes.append(node)
+        def _get(node):
+            if node not in seen:
+                seen.add(node)
+                if isinstance(node, node_type):
+                    nodes.append(node)
+                for child in node.children:
+                    _get(child.node)
 
+        _get(self.root_node)
         return tuple(nodes)
 
-    def changes(self, adding=None, deleting=None):
-        """Pass the given changes to the root_node."""
+    def _nodes(self, node_type):
+        """
+        Return the nodes of the network of type `node_type`.
+
+        The result is kept until a child is added to the root node. The
+        copies of a network get the nodes of the template remapped (see
+        :meth:`load_network`), so they never walk the network.
+
+        """
+        version, nodes = self._node_cache.get(node_type, (None, None))
+        if version != self.root_node.version:
+            nodes = self._get_nodes(node_type)
+            self._node_cache[node_type] = (self.root_node.version, nodes)
+        return nodes
+
+    def beta_sharing(self):
+        """
+        Return a `BetaSharing` report of the join nodes of the network.
+
+        - `joins`: Joins required by the rules.
+        - `nodes`: Join nodes actually built (shared joins are built once).
+        - `tokens`: Tokens currently stored in the join memories.
+        - `unshared_tokens`: Tokens that would be stored without sharing.
+
+        """
+        joins = nodes = tokens = unshared_tokens = 0
+        for node in self._get_nodes((OrdinaryMatchNode, NotNode)):
+            uses = len([n for n in self._below(node)
+                        if isinstance(n, ConflictSetNode)])
+            stored = len(node.left_memory) + len(node.right_memory)
+            joins += uses
+            nodes += 1
+            tokens += stored
+            unshared_tokens += stored * uses
+        return BetaSharing(joins, nodes, tokens, unshared_tokens)
+
+    @staticmethod
+    def _below(node):
+        """Return the set of nodes reachable from `node`."""
+        nodes = set()
+        pending = [c.node for c in node.children]
+        while pending:
+            current = pending.pop()
+            if current not in nodes:
+                nodes.add(current)
+                pending.extend(c.node for c in current.children)
+        return nodes
+
+    @property
+    def time_dependent(self):
+        """The network has windows, expired by the engine clock."""
+        return bool(self._nodes(WindowNode))
+
+    def changes(self, adding=None, deleting=None, modifying=None):
+        """
+        Pass the given changes to the root_node.
+
+        The windows of the network are updated afterwards, discarding
+        the facts expired by the engine clock even when there are no
+        changes.
+
+        The `(old, new)` pairs in `modifying` whose facts are also
+        present in `deleting` and `adding` (respectively) are handled
+        by :meth:`modify` instead, after the deletions and before the
+        additions.
+
+        """
+        shortcut = list()
+        if modifying:
+            added_ids = {id(f) for f in adding or ()}
+            deleted_ids = {id(f) for f in deleting or ()}
+            shortcut = [(old, new) for old, new in modifying
+                        if id(old) in deleted_ids
+                        and id(old) not in added_ids
+                        and id(new) in added_ids
+                        and id(new) not in deleted_ids]
+        skip = {id(f) for f in chain.from_iterable(shortcut)}
+
         if deleting is not None:
             for deleted in deleting:
-                self.root_node.remove(deleted)
+                if id(deleted) not in skip:
+                    self._remove_fact(deleted)
+
+        if shortcut:
+            self.modify(shortcut)
 
         if adding is not None:
             for added in adding:
-                self.root_node.add(added)
+                if id(added) not in skip:
+                    self._add_fact(added)
+
+        for window in self._nodes(WindowNode):
+            window.flush()
 
         added = list()
         removed = list()
 
-        for csn in self._get_conflict_set_nodes():
+        for csn in self._nodes(ConflictSetNode):
             c_added, c_removed = csn.get_activations()
             added.extend(c_added)
             removed.extend(c_removed)
 
         return (added, removed)
 
+    def _add_fact(self, fact):
+        """Send a new fact through the network."""
+        self.root_node.add(fact)
+
+    def _remove_fact(self, fact):
+        """Send a removed fact through the network."""
+        self.root_node.remove(fact)
+
+    def modify(self, pairs):
+        """
+        Replace each fact `old` (already in the network) with `new` for
+        every `(old, new)` in `pairs`.
+
+        Only the patterns constraining some of the changed slots are
+        evaluated again: `old` is removed and `new` is added through
+        their alpha branches, reusing the results of the checks over
+        the unchanged slots. For the rest of the patterns `old` is
+        replaced by `new` in the beta memories, keeping the existing
+        join results.
+
+        All the removals are made before any addition, as if the
+        changes were a batch of retracts followed by a batch of
+        declarations.
+
+        Return the number of node activations saved (also accumulated
+        in `self.saved_activations`).
+
+        """
+        saved = 0
+        plans = list()
+        for old, new in pairs:
+            changed = {k for k in set(old.keys()) | set(new.keys())
+                       if not old.isspecial(k)
+                       and old.get(k, self) != new.get(k, self)}
+
+            dependent = list()
+            independent = list()
+            for slots, path, below in self._alpha_paths.get(type(new), ()):
+                if slots is None or slots & changed:
+                    dependent.append(path)
+                else:
+                    independent.append((path, below))
+
+            plans.append((old, new, changed, dependent, independent,
+                          dict()))
+
+        # Remove the old facts from the dependent patterns.
+        for old, _, _, dependent, _, results in plans:
+            for path in dependent:
+                self._propagate(path, Token.invalid(old), results)
+
+        # Substitute in memories below the independent patterns.
+        for old, new, _, _, independent, _ in plans:
+            substituted = set()
+            for path, below in independent:
+                saved += 2 * len(path)
+                for node in below:
+                    if node not in substituted:
+                        substituted.add(node)
+                        saved += 2 * node.substitute(old, new)
+
+        # Add the new facts through the dependent patterns.
+        for old, new, changed, dependent, _, results in plans:
+            for path in dependent:
+                saved += self._propagate(path, Token.valid(new), results,
+                                         changed)
+            MATCHER.info("MODIFY %s -> %s", old, new)
+
+        MATCHER.info("MODIFY saved %d node activations", saved)
+        self.saved_activations += saved
+        return saved
+
+    @staticmethod
+    def _propagate(path, token, results, changed=None):
+        """
+        Send `token` through the alpha branch `path`.
+
+        The check results are stored in `results`. If `changed` is
+        given, the stored results for checks over the other slots are
+        reused. Return the number of reused results.
+
+        """
+        fact = next(iter(token.data))
+        reused = 0
+        for node in path:
+            check = node.matcher
+            if changed is not None and node in results and (
+                    isinstance(check, TypeCheck)
+                    or (isinstance(check, FeatureCheck)
+                        and check.what not in changed)):
+                match = results[node]
+                reused += 1
+            else:
+                match = check(fact)
+                results.setdefault(node, match)
+
+            token = node.test(token, match)
+            if token is None:
+                break
+        else:
+            for child in path[-1].children:
+                child.callback(token)
+
+        return reused
+
     def build_network(self):
-        ruleset = self.prepare_ruleset(self.engine)
+        if self.has_instance_rules(self.engine):
+            ruleset = self.prepare_ruleset(self.engine)
+        else:
+            ruleset = self.prepare_ruleset(type(self.engine))
         alpha_terminals = self.build_alpha_part(ruleset, self.root_node)
-        self.build_beta_part(ruleset, alpha_terminals)
+        self.build_beta_part(ruleset, alpha_terminals, self._clock)
+        self._alpha_paths = self.build_alpha_paths(ruleset,
+                                                   alpha_terminals,
+                                                   self.root_node)
+
+    def load_network(self, matcher):
+        """
+        Use a copy of the network of `matcher`, with empty memories.
+
+        Return the dictionary mapping the nodes of `matcher` to their
+        copies.
+
+        """
+        memo = dict()
+        self.root_node = matcher.root_node.clone(memo)
+        self._alpha_paths = defaultdict(list)
+        for fact_type, paths in matcher._alpha_paths.items():
+            self._alpha_paths[fact_type] = [
+                (slots, [memo[n] for n in path], tuple(memo[n] for n in below))
+                for slots, path, below in paths]
+
+        for node in memo.values():
+            if isinstance(node, WindowNode):
+                node.clock = self._clock
+
+        self._node_cache = {
+            node_type: (self.root_node.version,
+                        tuple(memo[n] for n in matcher._nodes(node_type)))
+            for node_type in (Node, ConflictSetNode, WindowNode)}
+
+        return memo
+
+    def _clock(self):
+        return self.engine.clock()
 
     def reset(self):
-        self.root_node.reset()
+        for node in self._nodes(Node):
+            node._reset()
+
+    @staticmethod
+    def has_instance_rules(engine):
+        """Return whether `engine` has rules set on the instance."""
+        return any(isinstance(value, Rule)
+                   for value in getattr(engine, '__dict__', {}).values())
 
     @staticmethod
     def prepare_ruleset(engine):
         """
-        Given a `KnowledgeEngine`, generate a set of rules suitable for
-        RETE network generation.
+        Given a `KnowledgeEngine` or a `KnowledgeEngine` subclass,
+        generate a set of rules suitable for RETE network generation.
 
         """
-        return {prepare_rule(rule) for rule in engine.get_rules()}
+        if isinstance(engine, type):
+            rules = (rule for _, rule in getmembers(engine)
+                     if isinstance(rule, Rule))
+        else:
+            rules = engine.get_rules()
+        return {prepare_rule(rule) for rule in rules}
 
     @staticmethod
     def build_alpha_part(ruleset, root_node):
@@ -87,6 +362,10 @@ class ReteMatcher(Matcher):
         Given a set of already adapted rules, build the alpha part of
         the RETE network starting at `root_node`.
 
+        Each branch starts with the test of the fact type, the root
+        node indexes these tests to dispatch each fact only to the
+        branches of its type (see :class:`.nodes.BusNode`).
+
         """
         # Generate a dictionary with rules and the set of facts of the
         # rule.
@@ -105,7 +384,12 @@ class ReteMatcher(Matcher):
             if isinstance(check, TypeCheck):
                 return float('inf')
             elif isinstance(check, FactCapture):
-                return float('-inf')
+                # The capture of the whole pattern is always the last
+                # one, so the terminal node of each pattern holds it.
+                if check.bind.startswith('__pattern_'):
+                    return float('-inf')
+                else:
+                    return 0
             elif isinstance(check, FeatureCheck):
                 return check_rank[check]
             else:
@@ -153,19 +437,72 @@ class ReteMatcher(Matcher):
         return fact_terminal_nodes
 
     @staticmethod
-    def build_beta_part(ruleset, alpha_terminals):
+    def build_beta_part(ruleset, alpha_terminals, clock=None):
         """
         Given a set of already adapted rules, and a dictionary of
         patterns and alpha_nodes, wire up the beta part of the RETE
         network.
 
+        `clock` is the time source of the window nodes.
+
+        The join nodes with the same inputs are shared by all the rules
+        (see :func:`.utils.wire_rule`).
+
         """
+        beta_nodes = dict()
         for rule in ruleset:
             if isinstance(rule[0], OR):
                 for subrule in rule[0]:
-                    wire_rule(rule, alpha_terminals, lhs=subrule)
+                    wire_rule(rule, alpha_terminals, lhs=subrule,
+                              clock=clock, beta_nodes=beta_nodes)
             else:
-                wire_rule(rule, alpha_terminals, lhs=rule)
+                wire_rule(rule, alpha_terminals, lhs=rule, clock=clock,
+                          beta_nodes=beta_nodes)
+
+    @staticmethod
+    def build_alpha_paths(ruleset, alpha_terminals, root_node):
+        """
+        Given a set of already adapted rules and their alpha terminals,
+        return a dictionary of fact types and a list of `(slots, path,
+        below)` for each pattern of that type.
+
+        `path` is the list of alpha nodes from the `root_node` to the
+        pattern terminal node, `below` all the nodes reachable from the
+        terminal node and `slots` the set of slots the pattern depends
+        on, or `None` if it depends on the whole fact (the fact is
+        captured and the rule has `where` tests, or the pattern feeds a
+        window).
+
+        """
+        def find_path(node, terminal):
+            if node is terminal:
+                return [node]
+            for child in node.children:
+                if isinstance(child.node, FeatureTesterNode):
+                    path = find_path(child.node, terminal)
+                    if path is not None:
+                        return [node] + path
+            return None
+
+        patterns = dict()
+        for rule in ruleset:
+            for fact in extract_facts(rule):
+                if fact.__bind__ is not None and rule.where:
+                    patterns[fact] = None
+                elif patterns.get(fact, True) is not None:
+                    patterns[fact] = {k for k in fact.keys()
+                                      if not fact.isspecial(k)}
+
+        alpha_paths = defaultdict(list)
+        for fact, slots in patterns.items():
+            terminal = alpha_terminals[fact]
+            path = find_path(root_node, terminal)[1:]
+            nodes = tuple(ReteMatcher._below(terminal))
+            if any(isinstance(node, WindowNode) for node in nodes):
+                slots = None
+            alpha_paths[type(fact)].append((slots, path, nodes))
+
+        return dict(alpha_paths)
 
     def print_network(self):
         """
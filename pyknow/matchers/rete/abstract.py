@@ -28,6 +28,38 @@ class Node(metaclass=abc.ABCMeta):
         """Reset this node's memory."""
         pass
 
+    def clone(self, memo=None):
+        """
+        Return a copy of this node and the nodes below it, with the same
+        structure but empty memories.
+
+        `memo` maps the nodes already copied to their copies, so the
+        nodes reachable through several branches are copied only once.
+
+        """
+        if memo is None:
+            memo = dict()
+        if self not in memo:
+            node = memo[self] = self._copy()
+            for child in self.children:
+                copy = child.node.clone(memo)
+                node.add_child(copy, getattr(copy, child.callback.__name__))
+        return memo[self]
+
+    def _copy(self):
+        """Return a new node like this one, without children."""
+        return self.__class__()
+
+    def substitute(self, old, new):
+        """
+        Replace the fact `old` with `new` in this node's memory.
+
+        Used to modify a fact without propagating it again through the
+        network. Return the number of tokens replaced.
+
+        """
+        return 0
+
     def __str__(self):
         return self.__class__.__name__
 
@@ -36,9 +68,9 @@ class OneInputNode(Node):
     """Nodes which only have one input port."""
 
     def activate(self, token):
-        """Make a copy of the received token and call `self._activate`."""
+        """Call `self._activate` with the received (immutable) token."""
         MATCHER.debug("Node <%s> activated with token %r", self, token)
-        return self._activate(token.copy())
+        return self._activate(token)
 
     @abc.abstractproperty
     def _activate(self, token):
@@ -50,9 +82,9 @@ class TwoInputNode(Node):
     """Nodes which have two input ports: left and right."""
 
     def activate_left(self, token):
-        """Make a copy of the received token and call `_activate_left`."""
+        """Call `_activate_left` with the received (immutable) token."""
         MATCHER.debug("Node <%s> activated left with token %r", self, token)
-        return self._activate_left(token.copy())
+        return self._activate_left(token)
 
     @abc.abstractproperty
     def _activate_left(self, token):
@@ -60,9 +92,9 @@ class TwoInputNode(Node):
         pass
 
     def activate_right(self, token):
-        """Make a copy of the received token and call `_activate_right`."""
+        """Call `_activate_right` with the received (immutable) token."""
         MATCHER.debug("Node <%s> activated right with token %r", self, token)
-        return self._activate_right(token.copy())
+        return self._activate_right(token)
 
     @abc.abstractproperty
     def _activate_right(self, token):
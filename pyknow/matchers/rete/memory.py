@@ -0,0 +1,191 @@
+"""Token memories for the RETE nodes."""
+
+from itertools import chain, repeat
+
+
+class TokenMemory:
+    """
+    Multiset of `TokenInfo` indexed by the values of some variables.
+
+    The tokens are partitioned by the values of the variables `keys`
+    in their context, so the tokens that can match a given context are
+    found without scanning the whole memory (see :meth:`candidates`).
+    Tokens not binding all the variables are kept apart and are always
+    candidates.
+
+    Tokens are added with :meth:`append` and removed with
+    :meth:`remove`, both in O(1). The memory also supports `in`, `len`
+    and iteration, in insertion order within each partition. The
+    `*_keyed` methods take the partition key (see :meth:`key`) instead
+    of the context.
+
+    """
+    def __init__(self, keys=()):
+        self.keys = tuple(keys)
+        self._partitions = dict()
+        self._unkeyed = dict()
+        self._size = 0
+
+    def key(self, context):
+        """
+        Return the partition key of a context (a mapping) or `None` if
+        it doesn't bind all the variables.
+
+        """
+        try:
+            return tuple(context[k] for k in self.keys)
+        except KeyError:
+            return None
+
+    def _key(self, info, context):
+        if context is None and self.keys:
+            context = dict(info.context)
+        return self.key(context)
+
+    def append(self, info, context=None):
+        """
+        Add `info` to the memory.
+
+        `context` is the context of `info` as a mapping, if available.
+
+        """
+        self.append_keyed(info, self._key(info, context))
+
+    def append_keyed(self, info, key):
+        """Add `info` to the memory given its partition `key`."""
+        if key is None:
+            partition = self._unkeyed
+        else:
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = self._partitions[key] = dict()
+        partition[info] = partition.get(info, 0) + 1
+        self._size += 1
+
+    def remove(self, info, context=None):
+        """
+        Remove one occurrence of `info` from the memory.
+
+        Raise `ValueError` if not present.
+
+        """
+        self.remove_keyed(info, self._key(info, context))
+
+    def remove_keyed(self, info, key):
+        """Remove one occurrence of `info` given its partition `key`."""
+        if key is None:
+            partition = self._unkeyed
+        else:
+            partition = self._partitions.get(key, {})
+        count = partition.get(info)
+        if count is None:
+            raise ValueError("%r not in memory" % (info, ))
+        elif count == 1:
+            del partition[info]
+            if not partition and key is not None:
+                del self._partitions[key]
+        else:
+            partition[info] = count - 1
+        self._size -= 1
+
+    def candidates(self, context):
+        """Iterate over the tokens that can match `context`."""
+        return self.candidates_keyed(self.key(context))
+
+    def candidates_keyed(self, key):
+        """Iterate over the tokens that can match the partition `key`."""
+        if key is None:
+            return iter(self)
+        elif key not in self._partitions and not self._unkeyed:
+            return iter(())
+        else:
+            return self._iter_partitions(
+                (self._partitions.get(key, {}), self._unkeyed))
+
+    @staticmethod
+    def _iter_partitions(partitions):
+        return chain.from_iterable(
+            repeat(info, count)
+            for partition in partitions
+            for info, count in list(partition.items()))
+
+    def __iter__(self):
+        return self._iter_partitions(
+            chain(self._partitions.values(), (self._unkeyed, )))
+
+    def __contains__(self, info):
+        key = self._key(info, None)
+        if key is None:
+            return info in self._unkeyed
+        else:
+            return info in self._partitions.get(key, {})
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self))
+
+
+class TokenCounter:
+    """
+    Mapping of `TokenInfo` to match counters indexed like a
+    :class:`TokenMemory`.
+
+    Counters are read and written with the mapping protocol, and the
+    tokens that can match a given context are found with
+    :meth:`candidates` without scanning the whole mapping.
+
+    """
+    def __init__(self, keys=()):
+        self.keys = tuple(keys)
+        self._counts = dict()
+        self._index = TokenMemory(keys)
+
+    def candidates(self, context):
+        """Iterate over the tokens that can match `context`."""
+        return self._index.candidates(context)
+
+    def set(self, info, count, context=None):
+        """
+        Set the counter of `info`.
+
+        `context` is the context of `info` as a mapping, if available.
+
+        """
+        if info not in self._counts:
+            self._index.append(info, context)
+        self._counts[info] = count
+
+    def pop(self, info, context=None):
+        """Remove `info` and return its counter."""
+        count = self._counts.pop(info)
+        self._index.remove(info, context)
+        return count
+
+    def __getitem__(self, info):
+        return self._counts[info]
+
+    def __setitem__(self, info, count):
+        self.set(info, count)
+
+    def __delitem__(self, info):
+        self.pop(info)
+
+    def __iter__(self):
+        return iter(list(self._counts))
+
+    def __contains__(self, info):
+        return info in self._counts
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __bool__(self):
+        return bool(self._counts)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self._counts)
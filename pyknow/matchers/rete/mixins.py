@@ -37,5 +37,8 @@ class HasMatcher:
 
         super().__init__()
 
+    def _copy(self):
+        return self.__class__(self.matcher)
+
     def __str__(self):
         return "%s: %s" % (self.__class__.__name__, self.matcher)
@@ -6,17 +6,23 @@ types (like `The One-input Node for Testing Variable Bindings) are not
 needed in this implementation.
 
 """
+from collections import OrderedDict, deque
 from collections.abc import Mapping
 from contextlib import suppress
 from itertools import chain
+import time
 
-from pyknow.activation import Activation
-from pyknow.rule import Rule
+from pyknow.fact import Fact
+
+from pyknow.activation import LazyActivation
+from pyknow.rule import LiteralPCE, Rule
 from pyknow.watchers import MATCHER, MATCH
 
 from . import mixins
 from .abstract import Node, OneInputNode, TwoInputNode
-from .token import Token
+from .check import FeatureCheck, TypeCheck
+from .memory import TokenCounter, TokenMemory
+from .token import Context, Token, TokenInfo
 
 
 class BusNode(mixins.AnyChild,
@@ -31,21 +37,56 @@ class BusNode(mixins.AnyChild,
     This node cannot be activated in the same manner as the other nodes.
     No tokens can be sent to it since this is the node where the first
     tokens are built.
+
+    The children testing the type of the facts (a `FeatureTesterNode`
+    with a `TypeCheck`) are indexed by that type. Each fact skips the
+    type tests and goes straight to the children of the nodes of its
+    own type, so its cost doesn't depend on the number of fact types
+    in the network. The rest of the children receive every fact.
     """
 
+    def __init__(self):
+        #: Fact type -> nodes testing that type
+        self.by_type = dict()
+        #: Children not testing the fact type
+        self.untyped = list()
+        #: Number of children added, to notice changes of the network
+        self.version = 0
+        super().__init__()
+
+    def add_child(self, node, callback):
+        """Add the child and index it by type if it is a type test."""
+        children = len(self.children)
+        super().add_child(node, callback)
+        if len(self.children) == children:
+            return
+
+        self.version += 1
+
+        check = getattr(node, 'matcher', None)
+        if isinstance(node, FeatureTesterNode) \
+                and isinstance(check, TypeCheck):
+            self.by_type.setdefault(check.fact_type, []).append(node)
+        else:
+            self.untyped.append(self.children[-1])
+
+    def _send(self, fact, token):
+        for node in self.by_type.get(type(fact), ()):
+            node._send(token)
+        for child in self.untyped:
+            child.callback(token)
+
     def add(self, fact):
-        """Create a VALID token and send it to all children."""
+        """Create a VALID token and send it to the children."""
         token = Token.valid(fact)
         MATCHER.debug("<BusNode> added %r", token)
-        for child in self.children:
-            child.callback(token)
+        self._send(fact, token)
 
     def remove(self, fact):
-        """Create an INVALID token and send it to all children."""
+        """Create an INVALID token and send it to the children."""
         token = Token.invalid(fact)
         MATCHER.debug("<BusNode> added %r", token)
-        for child in self.children:
-            child.callback(token)
+        self._send(fact, token)
 
 
 class WhereNode(mixins.AnyChild,
@@ -96,14 +137,90 @@ class FeatureTesterNode(mixins.AnyChild,
     some key and some value, and the current context of the token also
     have an entry for this key but with a different value. In this case
     the test do not pass.
+
+    Children testing a slot for equality with a literal value are hashed
+    by slot and value (alpha hashing): the fact goes only to the ones
+    expecting its value, with one lookup per slot instead of one test
+    per literal. The rest of the children receive every token.
     """
 
+    def __init__(self, matcher):
+        #: Slot -> literal value -> children testing that value
+        self.by_value = dict()
+        #: Children not hashed by value
+        self.unhashed = list()
+        super().__init__(matcher)
+
+    @staticmethod
+    def _literal(node):
+        """
+        Return the `(slot, value)` tested by `node` if it is an
+        equality test against a hashable literal, or `None`.
+
+        """
+        check = getattr(node, 'matcher', None)
+        if isinstance(node, FeatureTesterNode) \
+                and isinstance(check, FeatureCheck) \
+                and isinstance(check.how, LiteralPCE):
+            try:
+                hash(check.how.value)
+            except TypeError:
+                return None
+            else:
+                return check.what, check.how.value
+        return None
+
+    def add_child(self, node, callback):
+        """Add the child and hash it if it tests a literal value."""
+        children = len(self.children)
+        super().add_child(node, callback)
+        if len(self.children) == children:
+            return
+
+        literal = self._literal(node)
+        if literal is None:
+            self.unhashed.append(self.children[-1])
+        else:
+            what, value = literal
+            self.by_value.setdefault(what, dict()).setdefault(
+                value, []).append(self.children[-1])
+
     def _activate(self, token):
         """
         Activate this node.
 
         Test the given token with this token matcher function and iff
-        the test pass update the token and pass to all children.
+        the test pass pass the (maybe extended) token to the children.
+
+        """
+        token = self.test(token)
+        if token is not None:
+            self._send(token)
+
+    def _send(self, token):
+        """Send `token` (already tested) to the children."""
+        if self.by_value:
+            fact = next(iter(token.data))
+            for what, branches in self.by_value.items():
+                try:
+                    children = branches.get(fact[what], ())
+                except (KeyError, TypeError):
+                    continue
+                for child in children:
+                    child.callback(token)
+
+        for child in self.unhashed:
+            child.callback(token)
+
+    def test(self, token, match=None):
+        """
+        Test the given token.
+
+        If `match` is given it is used as the result of the matcher
+        function instead of calling it.
+
+        Return the token to pass to the children if the test pass (a new
+        token if the matcher added some context) or `None` otherwise.
 
         """
         try:
@@ -111,9 +228,10 @@ class FeatureTesterNode(mixins.AnyChild,
         except AssertionError as exc:
             raise ValueError(exc) from exc
         else:
-            fact = list(token.data)[0]
+            fact = next(iter(token.data))
 
-        match = self.matcher(fact)
+        if match is None:
+            match = self.matcher(fact)
 
         if match:
             if isinstance(match, Mapping):
@@ -121,16 +239,17 @@ class FeatureTesterNode(mixins.AnyChild,
                     if isinstance(key, tuple):  # Negated condition
                         if key[1] in token.context \
                                 and token.context[key[1]] == value:
-                            return False
+                            return None
                     else:
                         if token.context.get(key, value) != value:
-                            return False
+                            return None
                         if (False, key) in token.context \
                                 and token.context[(False, key)] == value:
-                            return False
-                token.context.update(match)
-            for child in self.children:
-                child.callback(token)
+                            return None
+                return token.extend(match)
+            return token
+        else:
+            return None
 
 
 class OrdinaryMatchNode(mixins.AnyChild,
@@ -150,12 +269,24 @@ class OrdinaryMatchNode(mixins.AnyChild,
     Matching pairs will be combined in one token containing facts from
     both and a combined context. This combined tokens will be sent to
     all children.
+
+    Both memories are indexed by the values of the variables in `keys`
+    (the variables bound in both sides), so each token is only tested
+    against the tokens of the other side with the same values.
     """
 
+    def __init__(self, matcher, keys=()):
+        """Initialize the node with a match callable and join `keys`."""
+        self.keys = tuple(keys)
+        super().__init__(matcher)
+
     def _reset(self):
         """Wipe node memory."""
-        self.left_memory = list()
-        self.right_memory = list()
+        self.left_memory = TokenMemory(self.keys)
+        self.right_memory = TokenMemory(self.keys)
+
+    def _copy(self):
+        return self.__class__(self.matcher, self.keys)
 
     def __activation(self, token, branch_memory, matching_memory,
                      is_left=True):
@@ -173,12 +304,13 @@ class OrdinaryMatchNode(mixins.AnyChild,
 
         """
         if token.is_valid():
-            branch_memory.append(token.to_info())
+            branch_memory.append(token.to_info(), token.context)
         else:
             with suppress(ValueError):
-                branch_memory.remove(token.to_info())
+                branch_memory.remove(token.to_info(), token.context)
 
-        for other_data, other_context in matching_memory:
+        for other_data, other_context in \
+                matching_memory.candidates(token.context):
             other_context = dict(other_context)
             if is_left:
                 left_context = token.context
@@ -195,17 +327,16 @@ class OrdinaryMatchNode(mixins.AnyChild,
                            left_context,
                            right_context)
 
-                newcontext = {k: v for k, v in token.context.items()
-                              if isinstance(k, str)}
+                # Negated values are not needed any further
+                newcontext = Context(chain(
+                    ((k, v) for k, v in token.context.items()
+                     if isinstance(k, str)),
+                    ((k, v) for k, v in other_context.items()
+                     if not isinstance(k, tuple))))
 
-                for k, v in other_context.items():
-                    if not isinstance(k, tuple):
-                        # Negated value are not needed any further
-                        newcontext[k] = v
-
-                newtoken = Token(token.tag,
-                                 token.data | other_data,
-                                 newcontext)
+                newtoken = Token.build(token.tag,
+                                       token.data | other_data,
+                                       newcontext)
 
                 for child in self.children:
                     child.callback(newtoken)
@@ -215,6 +346,16 @@ class OrdinaryMatchNode(mixins.AnyChild,
                             left_context,
                             right_context)
 
+    def substitute(self, old, new):
+        """Replace the fact `old` with `new` in both memories."""
+        count = 0
+        for memory in (self.left_memory, self.right_memory):
+            for info in [i for i in memory if old in i.data]:
+                memory.remove(info)
+                memory.append(info.substitute(old, new))
+                count += 1
+        return count
+
     def _activate_left(self, token):
         """Node left activation."""
         self.__activation(token,
@@ -241,58 +382,90 @@ class ConflictSetNode(mixins.AnyChild,
     facts.
     """
 
-    def __init__(self, rule):
-        """Initialize the node with the given `rule`."""
+    def __init__(self, rule, first_key=None):
+        """
+        Initialize the node with the given `rule`.
+
+        `first_key` is the context key of the fact matching the first
+        pattern of the rule, if any.
+
+        """
         try:
             assert isinstance(rule, Rule)
         except AssertionError as exc:
             raise TypeError(exc) from exc
         else:
             self.rule = rule
+            self.first_key = first_key
 
-        self.added = list()
-        self.removed = list()
+        self.added = dict()
+        self.removed = dict()
 
         super().__init__()
 
     def _reset(self):
         """Wipe the node internal memory."""
-        self.memory = list()
+        self.memory = TokenMemory()
+
+    def _copy(self):
+        return self.__class__(self.rule, self.first_key)
 
     def _activate(self, token):
         """Activate this node for the given token."""
 
         info = token.to_info()
 
-        activation = Activation(
-            self.rule,
-            frozenset(info.data),
-            {k: v for k, v in info.context if isinstance(k, str)})
-
         if token.is_valid():
-            if info not in self.memory:
-                self.memory.append(info)
-                if activation in self.removed:
-                    self.removed.remove(activation)
-                else:
-                    self.added.append(activation)
+            self._add(info)
         else:
-            try:
-                self.memory.remove(info)
-            except ValueError:
-                pass
+            self._remove(info)
+
+    def _activation(self, info):
+        return LazyActivation(self.rule, info.data, info.context,
+                              self.first_key)
+
+    def _add(self, info):
+        if info not in self.memory:
+            self.memory.append(info)
+            activation = self._activation(info)
+            if activation in self.removed:
+                del self.removed[activation]
             else:
-                if activation in self.added:
-                    self.added.remove(activation)
-                else:
-                    self.removed.append(activation)
+                self.added[activation] = None
+
+    def _remove(self, info):
+        try:
+            self.memory.remove(info)
+        except ValueError:
+            pass
+        else:
+            activation = self._activation(info)
+            if activation in self.added:
+                del self.added[activation]
+            else:
+                self.removed[activation] = None
+
+    def substitute(self, old, new):
+        """
+        Replace the fact `old` with `new` in the memory.
+
+        The activations of the old tokens are removed and the ones of
+        the new tokens are added, as if the fact were retracted and
+        declared again.
+
+        """
+        infos = [info for info in self.memory if old in info.data]
+        for info in infos:
+            self._remove(info)
+            self._add(info.substitute(old, new))
+        return len(infos)
 
     def get_activations(self):
-        """Return a list of activations."""
-        res = (self.added, self.removed)
+        """Return the lists of added and removed activations."""
+        res = (list(self.added), list(self.removed))
 
-        self.added = list()
-        self.removed = list()
+        self.added = dict()
+        self.removed = dict()
 
         return res
 
@@ -313,12 +486,24 @@ class NotNode(mixins.AnyChild,
     input ports and try to match tokens arriving in both of them. But
     pass VALID tokens to the children when no matches are found and
     INVALID tokens when they are.
+
+    Both memories are indexed by the values of the variables `keys`
+    (the ones bound in both sides), so each activation only tests the
+    tokens of the other memory sharing those values.
     """
 
+    def __init__(self, matcher, keys=()):
+        """Initialize the node with a match callable and join `keys`."""
+        self.keys = tuple(keys)
+        super().__init__(matcher)
+
     def _reset(self):
         """Wipe node internal memory."""
-        self.left_memory = dict()
-        self.right_memory = list()
+        self.left_memory = TokenCounter(self.keys)
+        self.right_memory = TokenMemory(self.keys)
+
+    def _copy(self):
+        return self.__class__(self.matcher, self.keys)
 
     def _activate_left(self, token):
         """
@@ -329,42 +514,41 @@ class NotNode(mixins.AnyChild,
         token and the number of occurences are stored in the left
         memory.
 
+        An invalid token is removed from the left memory, its stored
+        counter tells if it was passed to the children.
+
         If the number of matches is zero the token activates all children.
 
         """
-        if not self.right_memory:
-            if token.is_valid():
-                self.left_memory[token.to_info()] = 0
-            else:
-                del self.left_memory[token.to_info()]
-
-            for child in self.children:
-                child.callback(token)
-
-        elif token.is_valid():
+        info = token.to_info()
+        if token.is_valid():
             count = 0
-
-            for _, right_context in self.right_memory:
+            for _, right_context in \
+                    self.right_memory.candidates(token.context):
                 if self.matcher(token.context, dict(right_context)):
                     count += 1
 
-            if count == 0:
-                for child in self.children:
-                    child.callback(token)
-
-            self.left_memory[token.to_info()] = count
+            self.left_memory.set(info, count, token.context)
         else:
-            count = 0
-            for _, right_context in self.right_memory:
-                if self.matcher(token.context, dict(right_context)):
-                    count += 1
-                    break
+            count = self.left_memory.pop(info, token.context)
 
-            if count == 0:
-                for child in self.children:
-                    child.callback(token)
+        if count == 0:
+            for child in self.children:
+                child.callback(token)
 
-            del self.left_memory[token.to_info()]
+    def substitute(self, old, new):
+        """Replace the fact `old` with `new` keeping the match counters."""
+        count = 0
+        for left in [token for token in self.left_memory
+                     if old in token.data]:
+            self.left_memory[left.substitute(old, new)] = \
+                self.left_memory.pop(left)
+            count += 1
+        for info in [i for i in self.right_memory if old in i.data]:
+            self.right_memory.remove(info)
+            self.right_memory.append(info.substitute(old, new))
+            count += 1
+        return count
 
     def _activate_right(self, token):
         """
@@ -377,16 +561,16 @@ class NotNode(mixins.AnyChild,
 
         """
         if token.is_valid():
-            self.right_memory.append(token.to_info())
+            self.right_memory.append(token.to_info(), token.context)
             inc = 1
         else:
             inc = -1
-            self.right_memory.remove(token.to_info())
+            self.right_memory.remove(token.to_info(), token.context)
 
-        for left in self.left_memory:
+        for left in self.left_memory.candidates(token.context):
             if self.matcher(dict(left.context), token.context):
-                self.left_memory[left] += inc
-                newcount = self.left_memory[left]
+                newcount = self.left_memory[left] + inc
+                self.left_memory[left] = newcount
                 if (newcount == 0 and inc == -1) or \
                         (newcount == 1 and inc == 1):
                     if inc == -1:
@@ -396,3 +580,122 @@ class NotNode(mixins.AnyChild,
 
                     for child in self.children:
                         child.callback(newtoken)
+
+
+class WindowNode(mixins.AnyChild,
+                 OneInputNode):
+    """
+    Window Node.
+
+    Collect the facts arriving to this node during the last `size` time
+    units (as measured by calling `clock`). The facts are grouped by
+    the variables bound in their context and each group is sent to the
+    children as a single token containing all the facts of the group,
+    with the tuple of facts bound to `bind` in its context.
+
+    If `tumbling` is `True` the windows are aligned to multiples of
+    `size` and don't overlap.
+
+    The changes are accumulated and only sent to the children when
+    :meth:`flush` is called, so a batch of facts arriving to the same
+    group produces just one new token. The facts leaving the window are
+    discarded on :meth:`flush` too, in arrival order and without
+    scanning the groups.
+    """
+
+    def __init__(self, size, bind, tumbling=False, clock=time.monotonic):
+        """Initialize the node with the window parameters."""
+        self.size = size
+        self.bind = bind
+        self.tumbling = tumbling
+        self.clock = clock
+
+        super().__init__()
+
+    def _reset(self):
+        """Wipe the node internal memory."""
+        #: Group key -> OrderedDict of TokenInfo -> arrival time
+        self.groups = dict()
+        #: Group key -> TokenInfo sent to the children
+        self.emitted = dict()
+        #: Arrival order of (time, group, info), lazily cleaned
+        self.arrivals = deque()
+        self.dirty = set()
+
+    def _copy(self):
+        return self.__class__(self.size, self.bind, self.tumbling,
+                              self.clock)
+
+    @staticmethod
+    def _group(context):
+        return frozenset((k, v) for k, v in context.items()
+                         if isinstance(k, str) and not isinstance(v, Fact))
+
+    def _activate(self, token):
+        """Add or remove the token to/from its group."""
+        info = token.to_info()
+        group = self._group(token.context)
+
+        if token.is_valid():
+            now = self.clock()
+            self.groups.setdefault(group, OrderedDict())[info] = now
+            self.arrivals.append((now, group, info))
+            self.dirty.add(group)
+        else:
+            with suppress(KeyError):
+                del self.groups[group][info]
+                if not self.groups[group]:
+                    del self.groups[group]
+                self.dirty.add(group)
+
+    def _expire(self, now):
+        """Discard the facts out of the window at time `now`."""
+        if self.tumbling:
+            start = now - now % self.size
+
+            def expired(arrival):
+                return arrival < start
+        else:
+            def expired(arrival):
+                return arrival <= now - self.size
+
+        while self.arrivals and expired(self.arrivals[0][0]):
+            arrival, group, info = self.arrivals.popleft()
+            members = self.groups.get(group)
+            if members is not None and members.get(info) == arrival:
+                del members[info]
+                if not members:
+                    del self.groups[group]
+                self.dirty.add(group)
+
+    def flush(self):
+        """
+        Discard the expired facts and send the changed groups.
+
+        For each changed group an INVALID token with the previous
+        content (if any) and a VALID token with the current content (if
+        not empty) are sent to the children.
+
+        """
+        self._expire(self.clock())
+
+        for group in self.dirty:
+            old = self.emitted.pop(group, None)
+            if old is not None:
+                for child in self.children:
+                    child.callback(old.to_invalid_token())
+
+            members = self.groups.get(group)
+            if members:
+                facts = tuple(chain.from_iterable(i.data for i in members))
+                context = dict(group)
+                context[self.bind] = facts
+                new = TokenInfo(facts, context)
+                self.emitted[group] = new
+                for child in self.children:
+                    child.callback(new.to_valid_token())
+
+        self.dirty = set()
+
+    def __str__(self):
+        return "%s: %s" % (self.__class__.__name__, self.size)
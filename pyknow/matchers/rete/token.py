@@ -3,10 +3,42 @@
 from collections import namedtuple
 from collections.abc import Mapping
 from enum import Enum
+from itertools import chain
 
 from pyknow.fact import Fact
 
 
+class Context(dict):
+    """
+    Immutable context of a `Token`.
+
+    Nodes never change the context of a token; when some variables must
+    be added a new (small) context is created with :meth:`extend`.
+
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Token contexts are immutable.")
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+    __ior__ = _immutable
+
+    def extend(self, mapping):
+        """Return a new context with the pairs of `mapping` added."""
+        return Context(chain(self.items(), mapping.items()))
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self), ))
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, dict.__repr__(self))
+
+
+EMPTY_CONTEXT = Context()
+
+
 class TokenInfo(namedtuple('_TokenInfo', ['data', 'context'])):
     """Tag agnostig version of Token with inmutable data."""
 
@@ -18,15 +50,29 @@ class TokenInfo(namedtuple('_TokenInfo', ['data', 'context'])):
 
     def to_valid_token(self):
         """Create a VALID token using this data."""
-        return Token.valid(self.data, dict(self.context))
+        return Token.build(Token.TagType.VALID, self.data,
+                           Context(self.context))
 
     def to_invalid_token(self):
         """Create an INVALID token using this data."""
-        return Token.invalid(self.data, dict(self.context))
+        return Token.build(Token.TagType.INVALID, self.data,
+                           Context(self.context))
+
+    def substitute(self, old, new):
+        """Return a copy of this info with the fact `old` replaced by `new`."""
+        return TokenInfo(
+            (f if f is not old else new for f in self.data),
+            {k: (v if v is not old else new) for k, v in self.context})
 
 
 class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
-    """Token, as described by RETE but with context."""
+    """
+    Token, as described by RETE but with context.
+
+    Tokens are immutable (`data` is a `frozenset` and `context` a
+    :class:`Context`), so the nodes pass them along without copying.
+
+    """
 
     class TagType(Enum):
         """Types of Token TAG data."""
@@ -34,6 +80,10 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         VALID = True
         INVALID = False
 
+    #: Check the tokens created by the nodes with :meth:`build`. Only
+    #: useful while debugging the network, it slows down every match.
+    debug = False
+
     def __new__(cls, tag, data, context=None):
         """
         Instantiate a new Token with the given tag, data and context.
@@ -46,21 +96,49 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
 
         """
         if context is None:
-            context = {}
+            context = EMPTY_CONTEXT
+        elif not isinstance(context, Context):
+            cls._check_context(context)
+            context = Context(context)
+
+        data = frozenset((data, )) if isinstance(data, Fact) \
+            else frozenset(data)
 
+        cls._check(tag, data, context)
+        return super(Token, cls).__new__(cls, tag, data, context)
+
+    @classmethod
+    def build(cls, tag, data, context):
+        """
+        Create a token from an already immutable `data` (a `frozenset`
+        of facts) and `context` (a `Context`).
+
+        This is the fast path used by the nodes: the arguments are only
+        checked when :attr:`debug` is set.
+
+        """
+        if cls.debug:
+            cls._check(tag, data, context)
+            if not isinstance(data, frozenset):
+                raise TypeError("data must be a frozenset")
+            if not isinstance(context, Context):
+                raise TypeError("context must be a Context")
+        return tuple.__new__(cls, (tag, data, context))
+
+    @classmethod
+    def _check(cls, tag, data, context):
         try:
             assert isinstance(tag, cls.TagType), \
                 "tag must be of `Token.TagType` type"
-            assert (isinstance(data, Fact) or
-                    all(isinstance(f, Fact) for f in data)), \
+            assert all(isinstance(f, Fact) for f in data), \
                 "data must be either Fact or iterable of Facts"
-            assert isinstance(context, Mapping)
         except AssertionError as exc:
             raise TypeError(exc) from exc
 
-        data = {data} if isinstance(data, Fact) else set(data)
-        self = super(Token, cls).__new__(cls, tag, data, context)
-        return self
+    @staticmethod
+    def _check_context(context):
+        if not isinstance(context, Mapping):
+            raise TypeError("context must be a mapping")
 
     def to_info(self):
         """
@@ -72,6 +150,10 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         """
         return TokenInfo(self.data, self.context)
 
+    def extend(self, mapping):
+        """Return a copy of this token with `mapping` added to its context."""
+        return self.build(self.tag, self.data, self.context.extend(mapping))
+
     @classmethod
     def valid(cls, data, context=None):
         """Shortcut to create a VALID Token."""
@@ -87,11 +169,5 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         return self.tag == self.TagType.VALID
 
     def copy(self):
-        """
-        Make a new instance of this Token.
-
-        This method makes a copy of the mutable part of the token before
-        making the instance.
-
-        """
-        return self.__class__(self.tag, self.data.copy(), self.context.copy())
+        """Tokens are immutable, return this same token."""
+        return self
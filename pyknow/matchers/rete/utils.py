@@ -5,10 +5,10 @@ from .check import FeatureCheck, TypeCheck, FactCapture, SameContextCheck
 from .check import WhereCheck
 from .dnf import dnf
 from .nodes import ConflictSetNode, NotNode, OrdinaryMatchNode
-from .nodes import FeatureTesterNode, WhereNode
-from pyknow import Rule, InitialFact, NOT, OR, Fact, AND
+from .nodes import FeatureTesterNode, WhereNode, WindowNode
+from pyknow import Rule, InitialFact, NOT, OR, Fact, AND, WINDOW
 from pyknow.rule import ANDPCE, ORPCE, NOTPCE
-from pyknow.rule import ConditionalElement
+from pyknow.rule import ConditionalElement, PatternConditionalElement
 from pyknow.rule import LiteralPCE, PredicatePCE, WildcardPCE
 from pyknow.watchers import MATCH
 
@@ -103,10 +103,84 @@ def generate_checks(fact):
     yield FactCapture("__pattern_%s__" % id(fact))
 
 
-def wire_rule(rule, alpha_terminals, lhs=None):
+@singledispatch
+def bound_variables(elem):
+    """
+    Given a pattern or a conditional element, return the set of
+    variables it can bind in the context of the tokens it produces.
+
+    """
+    return set()
+
+
+@bound_variables.register(PatternConditionalElement)
+def _(elem):
+    variables = set()
+    if isinstance(elem, (LiteralPCE, PredicatePCE, WildcardPCE)):
+        if elem.__bind__ is not None:
+            variables.add(elem.__bind__)
+    elif isinstance(elem, (ANDPCE, ORPCE)):
+        for pce in elem:
+            variables |= bound_variables(pce)
+    return variables
+
+
+@bound_variables.register(Fact)
+def _(elem):
+    variables = set()
+    for key, value in elem.items():
+        if key == '__bind__':
+            variables.add(value)
+        elif not elem.isspecial(key):
+            variables |= bound_variables(value)
+    return variables
+
+
+@bound_variables.register(AND)
+@bound_variables.register(OR)
+@bound_variables.register(Rule)
+def _(elem):
+    variables = set()
+    for ce in elem:
+        variables |= bound_variables(ce)
+    return variables
+
+
+@bound_variables.register(WINDOW)
+def _(elem):
+    variables = bound_variables(elem.pattern)
+    if elem.__bind__ is not None:
+        variables.add(elem.__bind__)
+    return variables
+
+
+def wire_rule(rule, alpha_terminals, lhs=None, clock=None, beta_nodes=None):
+    """
+    Build the beta network of `rule` (or of its `lhs`, if given) over
+    the `alpha_terminals` and connect it to a new `ConflictSetNode`.
+
+    `beta_nodes` is a dictionary of the join nodes already built, by
+    node type, join keys and input nodes. A join with the same inputs
+    is reused instead of built again, so rules starting with the same
+    patterns share their join memories. Pass the same dictionary when
+    wiring all the rules of a network.
+
+    """
     if lhs is None:
         lhs = rule
 
+    if beta_nodes is None:
+        beta_nodes = dict()
+
+    def _join(node_type, keys, left_branch, right_branch):
+        key = (node_type, keys, left_branch, right_branch)
+        node = beta_nodes.get(key)
+        if node is None:
+            node = beta_nodes[key] = node_type(SameContextCheck(), keys=keys)
+            left_branch.add_child(node, node.activate_left)
+            right_branch.add_child(node, node.activate_right)
+        return node
+
     @singledispatch
     def _wire_rule(elem):
         raise TypeError("Unknown type %s" % type(elem))
@@ -114,29 +188,33 @@ def wire_rule(rule, alpha_terminals, lhs=None):
     @_wire_rule.register(Rule)
     @_wire_rule.register(AND)
     def _(elem):
-        if len(elem) == 1 and isinstance(elem[0], Fact):
-            return alpha_terminals[elem[0]]
+        if len(elem) == 1:
+            return _wire_rule(elem[0])
         elif len(elem) > 1:
             current_node = None
+            left_variables = bound_variables(elem[0])
             for f, s in zip(elem, elem[1:]):
-                if isinstance(s, NOT):
-                    node_cls = NotNode
-                else:
-                    node_cls = OrdinaryMatchNode
-
                 if current_node is None:
-                    current_node = node_cls(SameContextCheck())
                     left_branch = _wire_rule(f)
-                    right_branch = _wire_rule(s)
                 else:
                     left_branch = current_node
-                    right_branch = _wire_rule(s)
-                    current_node = node_cls(SameContextCheck())
+                right_branch = _wire_rule(s)
+
+                if isinstance(s, NOT):
+                    node_type = NotNode
+                    right_variables = bound_variables(s[0])
+                else:
+                    node_type = OrdinaryMatchNode
+                    right_variables = bound_variables(s)
+
+                current_node = _join(
+                    node_type,
+                    tuple(sorted(left_variables & right_variables)),
+                    left_branch,
+                    right_branch)
 
-                left_branch.add_child(current_node,
-                                      current_node.activate_left)
-                right_branch.add_child(current_node,
-                                       current_node.activate_right)
+                if node_type is OrdinaryMatchNode:
+                    left_variables |= right_variables
             return current_node
         else:
             raise RuntimeError("Invalid rule! %r" % elem)
@@ -149,6 +227,19 @@ def wire_rule(rule, alpha_terminals, lhs=None):
     def _(elem):
         return alpha_terminals[elem[0]]
 
+    @_wire_rule.register(WINDOW)
+    def _(elem):
+        if elem.__bind__ is None:
+            bind = "__window_%s__" % id(elem)
+        else:
+            bind = elem.__bind__
+
+        kwargs = dict() if clock is None else {'clock': clock}
+        window_node = WindowNode(elem.size, bind, elem.tumbling, **kwargs)
+        alpha_terminals[elem.pattern].add_child(window_node,
+                                                window_node.activate)
+        return window_node
+
     # Build beta network
     last_node = _wire_rule(lhs)
 
@@ -158,6 +249,17 @@ def wire_rule(rule, alpha_terminals, lhs=None):
         last_node.add_child(test_node, test_node.activate)
         last_node = test_node
 
+    # The alpha terminal of a pattern captures the matching fact, under
+    # the key of the first equal pattern wired (see
+    # `ReteMatcher.build_alpha_part`).
+    first = lhs
+    while isinstance(first, (Rule, AND)) and first:
+        first = first[0]
+    if isinstance(first, Fact):
+        first_key = alpha_terminals[first].matcher.bind
+    else:
+        first_key = None
+
     # Add a new child to the last node to trigger the rule
-    conflict_set_node = ConflictSetNode(rule)
+    conflict_set_node = ConflictSetNode(rule, first_key)
     last_node.add_child(conflict_set_node, conflict_set_node.activate)
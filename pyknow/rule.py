@@ -1,6 +1,8 @@
 from collections.abc import Callable, Iterable
 from functools import update_wrapper, partial, lru_cache
 from itertools import chain
+from operator import itemgetter
+import inspect
 
 from pyknow import watchers
 
@@ -30,12 +32,14 @@ class Rule(ConditionalElement):
        pass all the arguments along.
     """
 
-    def __new__(cls, *args, salience=0, where=None):
+    def __new__(cls, *args, salience=0, where=None, agenda_group='MAIN'):
         obj = super(Rule, cls).__new__(cls, *args)
 
         obj._wrapped = None
         obj._wrapped_self = None
+        obj._arguments = None
         obj.salience = salience
+        obj.agenda_group = agenda_group
 
         if where is None:
             where = list()
@@ -51,7 +55,10 @@ class Rule(ConditionalElement):
         conditions.
 
         """
-        obj = self.__class__(*args, salience=self.salience, where=self.where)
+        obj = self.__class__(*args,
+                             salience=self.salience,
+                             where=self.where,
+                             agenda_group=self.agenda_group)
 
         if self._wrapped:
             obj = obj(self._wrapped)
@@ -60,16 +67,19 @@ class Rule(ConditionalElement):
 
     def __hash__(self):
         return hash(tuple(self)
-                    + (self._wrapped, self._wrapped_self, self.salience))
+                    + (self._wrapped, self._wrapped_self, self.salience,
+                       self.agenda_group))
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             self_data = tuple(self) + (self._wrapped,
                                        self._wrapped_self,
-                                       self.salience)
+                                       self.salience,
+                                       self.agenda_group)
             other_data = tuple(other) + (other._wrapped,
                                          other._wrapped_self,
-                                         other.salience)
+                                         other.salience,
+                                         other.agenda_group)
             return self_data == other_data
         else:
             return False
@@ -84,12 +94,82 @@ class Rule(ConditionalElement):
                 raise AttributeError("Mandatory function not provided.")
             else:
                 self._wrapped = args[0]
+                self._arguments = self._compile_arguments(self._wrapped)
                 return update_wrapper(self, self._wrapped)
         elif self._wrapped_self is None:
             return self._wrapped(*args, **kwargs)
         else:
             return self._wrapped(self._wrapped_self, *args, **kwargs)
 
+    @staticmethod
+    def _compile_arguments(function):
+        """
+        Return a function extracting from a match context the arguments
+        `function` accepts after the first one (the engine).
+
+        The signature is inspected only once. If all the parameters can
+        be given positionally and have no default values, the extractor
+        returns a tuple of positional arguments, otherwise a mapping of
+        keyword arguments with the variables present in the context.
+        Variables not accepted by `function` are ignored, unless it
+        accepts any keyword argument.
+
+        """
+        try:
+            parameters = list(inspect.signature(function).parameters.values())
+        except (TypeError, ValueError):
+            parameters = [None, inspect.Parameter(
+                'kwargs', inspect.Parameter.VAR_KEYWORD)]
+
+        names = list()
+        positional = True
+        any_keyword = False
+        for parameter in parameters[1:]:
+            if parameter.kind is parameter.VAR_KEYWORD:
+                any_keyword = True
+            elif parameter.kind is not parameter.VAR_POSITIONAL:
+                names.append(parameter.name)
+                if (parameter.kind is parameter.KEYWORD_ONLY
+                        or parameter.default is not parameter.empty):
+                    positional = False
+
+        def keywords(context):
+            if any_keyword:
+                return {k: v for k, v in context.items()
+                        if not k.startswith('__')}
+            else:
+                return {n: context[n] for n in names if n in context}
+
+        if any_keyword or not positional:
+            return keywords
+        elif not names:
+            return lambda context: ()
+        else:
+            getter = itemgetter(*names)
+            single = len(names) == 1
+
+            def arguments(context):
+                try:
+                    values = getter(context)
+                except KeyError:
+                    # Let the call fail with the usual error
+                    return keywords(context)
+                else:
+                    return (values, ) if single else values
+
+            return arguments
+
+    def get_arguments(self, context):
+        """
+        Return the arguments for the RHS of this rule given the context
+        of a match.
+
+        The result is a tuple of positional arguments or a mapping of
+        keyword arguments (see :meth:`_compile_arguments`).
+
+        """
+        return self._arguments(context)
+
     def __repr__(self):
         return "%s => %r" % (super().__repr__(), self._wrapped)
 
@@ -99,6 +179,8 @@ class Rule(ConditionalElement):
 
 
 class Bindable:
+    __slots__ = ()
+
     def __rlshift__(self, other):
         if not isinstance(other, str):
             raise TypeError("%s can only be binded to a string" % self)
@@ -110,6 +192,8 @@ class Bindable:
 
 
 class ComposableCE:
+    __slots__ = ()
+
     def __and__(self, other):
         if isinstance(self, AND) and isinstance(other, AND):
             return AND(*[x for x in chain(self, other)])
@@ -146,6 +230,53 @@ class NOT(ComposableCE, ConditionalElement):
     pass
 
 
+class WINDOW(Bindable, ComposableCE, ConditionalElement):
+    """
+    Collect the facts matching `pattern` declared in the last `size`
+    seconds (as measured by the engine clock).
+
+    The facts are grouped by the values of the variables bound in the
+    pattern and each group matches as a tuple of facts, in declaration
+    order, bound to the name given with ``<<``.
+
+    If `tumbling` is `True` the windows don't overlap: all the facts
+    are discarded at once every `size` seconds.
+
+    """
+    def __new__(cls, pattern, size, tumbling=False, __bind__=None):
+        if size <= 0:
+            raise ValueError("WINDOW size must be positive.")
+        obj = super(WINDOW, cls).__new__(cls, pattern)
+        obj.size = size
+        obj.tumbling = tumbling
+        obj.__bind__ = __bind__
+        return obj
+
+    @property
+    def pattern(self):
+        return self[0]
+
+    def __hash__(self):
+        return hash((self.__class__, self.pattern, self.size,
+                     self.tumbling, self.__bind__))
+
+    def __eq__(self, other):
+        return (self.__class__ == other.__class__
+                and self.pattern == other.pattern
+                and self.size == other.size
+                and self.tumbling == other.tumbling
+                and self.__bind__ == other.__bind__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "%s(%r, %r%s)" % (self.__class__.__name__,
+                                 self.pattern,
+                                 self.size,
+                                 ", tumbling=True" if self.tumbling else "")
+
+
 class ComposablePCE:
     def __and__(self, other):
         if isinstance(self, ANDPCE) and isinstance(other, ANDPCE):
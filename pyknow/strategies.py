@@ -1,35 +1,193 @@
-from collections import defaultdict, deque
-from itertools import chain
-import operator as op
+from functools import lru_cache
+from itertools import count
+import abc
+import random
 
 from pyknow.abstract import Strategy
+from pyknow.fact import Fact
+from pyknow.rule import ConditionalElement
 
 
-def listdict():
-    """ Defaultdict of a list """
-    return defaultdict(deque)
+class KeyStrategy(Strategy):
+    """
+    Base class of the strategies ordering the agenda by a key computed
+    once for each activation (see :meth:`get_key`).
 
+    The agenda is updated in place, so each added or removed activation
+    costs O(log n).
 
-class DepthStrategy(Strategy):
+    """
+    @abc.abstractmethod
+    def get_key(self, activation):
+        """
+        Return the agenda key of `activation`.
+
+        Activations with lower keys are executed first, ties are broken
+        by the order in which they were added.
+
+        """
+        pass
+
+    def _update_agenda(self, agenda, added, removed):
+        for act in removed:
+            agenda.remove(act)
+
+        for act in added:
+            agenda.add(act, self.get_key(act))
+
+
+def recency(activation):
+    """
+    Return a key sorting `activation` from the most recent facts.
+
+    The fact ids are sorted from the most recent and negated so the
+    newest facts come first. The trailing `1` (greater than any negated
+    id) makes an activation come after the ones with more facts and the
+    same most recent ones.
+
+    """
+    factids = sorted((f['__factid__'] for f in activation.facts),
+                     reverse=True)
+    return tuple(-factid for factid in factids) + (1, )
+
+
+@lru_cache(maxsize=1024)
+def specificity(rule):
+    """
+    Return the number of tests of the left hand side of `rule`.
+
+    Each constrained slot of each pattern and each `where` test count
+    as one.
+
+    """
+    def _count(ce):
+        if isinstance(ce, Fact):
+            return sum(1 for k in ce if not ce.isspecial(k))
+        elif isinstance(ce, ConditionalElement):
+            return sum(_count(e) for e in ce)
+        else:
+            return 0
+
+    return _count(rule) + len(rule.where)
+
+
+class DepthStrategy(KeyStrategy):
+    """
+    Execute first the activations of the rules with higher salience
+    and, for the same salience, the ones with the most recent facts.
+
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def _update_agenda(self, agenda, added, removed):
-        activations = list(agenda.activations)
-        activations.extend(added)
+    @staticmethod
+    def get_key(activation):
+        return (-activation.rule.salience, recency(activation))
 
-        for act in removed:
-            try:
-                activations.remove(act)
-            except ValueError:
-                # Already executed rule.
-                pass
-
-        sorted_activations = sorted(
-            enumerate(activations),
-            key=lambda x: (x[1].rule.salience,
-                           sorted((f['__factid__'] for f in x[1].facts),
-                                  reverse=True)),
-            reverse=True)
-
-        return (act for _, act in sorted_activations)
+
+class BreadthStrategy(KeyStrategy):
+    """
+    Execute first the activations of the rules with higher salience
+    and, for the same salience, the oldest activations.
+
+    """
+    @staticmethod
+    def get_key(activation):
+        return (-activation.rule.salience, )
+
+
+class LEXStrategy(KeyStrategy):
+    """
+    CLIPS ``lex`` strategy.
+
+    For the same salience, execute first the activations with the most
+    recent facts and then the ones of the rules with more tests.
+
+    """
+    @staticmethod
+    def get_key(activation):
+        return (-activation.rule.salience,
+                recency(activation),
+                -specificity(activation.rule))
+
+
+class MEAStrategy(KeyStrategy):
+    """
+    CLIPS ``mea`` strategy.
+
+    For the same salience, execute first the activations whose fact
+    matching the first pattern of the rule is the most recent, then
+    follow the ``lex`` strategy.
+
+    """
+    @staticmethod
+    def first_factid(activation):
+        """
+        Return the id of the fact matching the first pattern of the
+        rule, or -1 if it can't be found.
+
+        """
+        fact = activation.first_fact()
+        if fact is None:
+            return -1
+        else:
+            return fact['__factid__']
+
+    @classmethod
+    def get_key(cls, activation):
+        return (-activation.rule.salience,
+                -cls.first_factid(activation),
+                recency(activation),
+                -specificity(activation.rule))
+
+
+class SimplicityStrategy(KeyStrategy):
+    """
+    CLIPS ``simplicity`` strategy.
+
+    For the same salience, execute first the activations of the rules
+    with less tests and then the newest activations.
+
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counter = count()
+
+    def get_key(self, activation):
+        return (-activation.rule.salience,
+                specificity(activation.rule),
+                -next(self._counter))
+
+
+class ComplexityStrategy(KeyStrategy):
+    """
+    CLIPS ``complexity`` strategy.
+
+    For the same salience, execute first the activations of the rules
+    with more tests and then the newest activations.
+
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counter = count()
+
+    def get_key(self, activation):
+        return (-activation.rule.salience,
+                -specificity(activation.rule),
+                -next(self._counter))
+
+
+class RandomStrategy(KeyStrategy):
+    """
+    CLIPS ``random`` strategy.
+
+    For the same salience, execute the activations in random order.
+    Pass a `seed` to get reproducible executions.
+
+    """
+    def __init__(self, *args, seed=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._random = random.Random(seed)
+
+    def get_key(self, activation):
+        return (-activation.rule.salience, self._random.random())
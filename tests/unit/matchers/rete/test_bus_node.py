@@ -67,3 +67,38 @@ def test_busnode_remove(TestNode):
 
     assert tn1.added == [Token.invalid(Fact())]
     assert tn2.added == [Token.invalid(Fact())]
+
+
+def test_busnode_dispatch_by_type(TestNode):
+    from pyknow.matchers.rete.nodes import BusNode, FeatureTesterNode
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    bn = BusNode()
+    type_a = FeatureTesterNode(TypeCheck(A))
+    type_b = FeatureTesterNode(TypeCheck(B))
+    bn.add_child(type_a, type_a.activate)
+    bn.add_child(type_b, type_b.activate)
+
+    tn_a = TestNode()
+    tn_b = TestNode()
+    tn_any = TestNode()
+    type_a.add_child(tn_a, tn_a.activate)
+    type_b.add_child(tn_b, tn_b.activate)
+    bn.add_child(tn_any, tn_any.activate)
+
+    assert bn.by_type == {A: [type_a], B: [type_b]}
+
+    bn.add(A())
+    bn.remove(B())
+
+    assert tn_a.added == [Token.valid(A())]
+    assert tn_b.added == [Token.invalid(B())]
+    assert tn_any.added == [Token.valid(A()), Token.invalid(B())]
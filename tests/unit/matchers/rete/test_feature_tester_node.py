@@ -79,8 +79,7 @@ def test_featuretesternode_pass_when_callable_adds_context(TestNode):
 
     ftn.activate(token)
 
-    newtoken = token.copy()
-    newtoken.context['something'] = True
+    newtoken = Token.valid(Fact(test=True), {'something': True})
 
     assert tn1.added == tn2.added == [newtoken]
 
@@ -101,8 +100,7 @@ def test_featuretesternode_pass_when_callable_modify_context(TestNode):
 
     ftn.activate(token)
 
-    newtoken = token.copy()
-    newtoken.context['something'] = True
+    newtoken = Token.valid(Fact(test=True), {'something': True})
 
     assert tn1.added == tn2.added == []
 
@@ -123,8 +121,7 @@ def test_featuretesternode_pass_when_callable_dont_modify_context(TestNode):
 
     ftn.activate(token)
 
-    newtoken = token.copy()
-    newtoken.context['something'] = True
+    newtoken = Token.valid(Fact(test=True), {'something': True})
 
     assert tn1.added == tn2.added == [newtoken]
 
@@ -143,3 +140,38 @@ def test_featuretesternode_pass_fact_to_matcher():
     ftn = FeatureTesterNode(_matcher)
 
     ftn.activate(Token.valid(fact))
+
+
+def test_featuretesternode_hashes_literal_children(TestNode):
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.check import FeatureCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+    from pyknow import L, W
+
+    parent = FeatureTesterNode(lambda f: True)
+    is_a = FeatureTesterNode(FeatureCheck('country', 'AR'))
+    is_b = FeatureTesterNode(FeatureCheck('country', L('BR')))
+    any_ = FeatureTesterNode(FeatureCheck('country', W()))
+    for node in (is_a, is_b, any_):
+        parent.add_child(node, node.activate)
+
+    tn_a = TestNode()
+    tn_b = TestNode()
+    tn_any = TestNode()
+    is_a.add_child(tn_a, tn_a.activate)
+    is_b.add_child(tn_b, tn_b.activate)
+    any_.add_child(tn_any, tn_any.activate)
+
+    assert parent.by_value == {'country': {'AR': [parent.children[0]],
+                                           'BR': [parent.children[1]]}}
+    assert [c.node for c in parent.unhashed] == [any_]
+
+    parent.activate(Token.valid(Fact(country='AR')))
+    parent.activate(Token.valid(Fact(country='UY')))
+    parent.activate(Token.valid(Fact(other='AR')))
+
+    assert tn_a.added == [Token.valid(Fact(country='AR'))]
+    assert tn_b.added == []
+    assert tn_any.added == [Token.valid(Fact(country='AR')),
+                            Token.valid(Fact(country='UY'))]
@@ -83,3 +83,309 @@ def test_retematcher_changes_return_activations_if_csn():
 
     assert len(added) == 2
     assert all(isinstance(a, Activation) for a in added)
+
+
+def test_retematcher_modify_only_propagates_dependent_patterns():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    class Test(KnowledgeEngine):
+        @Rule(A(name=W('n')), B(name=W('n')))
+        def by_name(self, n):
+            pass
+
+        @Rule(A(counter=1))
+        def by_counter(self):
+            pass
+
+    ke = Test()
+    ke.reset()
+    ke.declare(A(name='x', counter=0), B(name='x'))
+
+    activations = {a.rule.__name__ for a in ke.agenda.activations}
+    assert activations == {'by_name'}
+
+    a = ke.facts.find(A(name='x'))
+    ke.modify(a, counter=1)
+
+    activations = {a.rule.__name__: a for a in ke.agenda.activations}
+    assert set(activations) == {'by_name', 'by_counter'}
+    assert ke.facts.find(A(name='x', counter=1)) \
+        in activations['by_name'].facts
+    assert ke.matcher.saved_activations > 0
+
+
+def test_retematcher_modify_same_result_as_retract_and_declare():
+    from pyknow import KnowledgeEngine, Rule, Fact, W, NOT
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    class Test(KnowledgeEngine):
+        @Rule(A(name=W('n')), B(name=W('n')), NOT(B(name=W('n'), x=1)))
+        def rule1(self, n):
+            pass
+
+        @Rule(A(name=W('n'), counter=W('c')), B(name=W('n')))
+        def rule2(self, n, c):
+            pass
+
+    def activations(ke):
+        return {(a.rule.__name__,
+                 frozenset(f.as_key() for f in a.facts))
+                for a in ke.agenda.activations}
+
+    ke1 = Test()
+    ke2 = Test()
+    for ke in (ke1, ke2):
+        ke.reset()
+        ke.declare(A(name='x', counter=0),
+                   A(name='y', counter=0),
+                   B(name='x'),
+                   B(name='y'))
+
+    for old, new in [(B(name='y'), {'x': 1}),
+                     (A(name='x', counter=0), {'counter': 1}),
+                     (B(name='x'), {'name': 'y'})]:
+        ke1.modify(ke1.facts.find(old), **new)
+
+        declared = ke2.facts.find(old)
+        ke2.retract(declared)
+        newfact = declared.copy()
+        newfact.update(new)
+        ke2.declare(newfact)
+
+        assert activations(ke1) == activations(ke2)
+
+
+def test_retematcher_window_counts_facts_per_group():
+    from pyknow import KnowledgeEngine, Fact, Rule, W, WINDOW
+
+    class Login(Fact):
+        pass
+
+    class User(Fact):
+        pass
+
+    counts = []
+
+    class Test(KnowledgeEngine):
+        now = 0
+
+        def clock(self):
+            return self.now
+
+        @Rule(User(name=W('u')),
+              'logins' << WINDOW(Login(user=W('u')), 300))
+        def count(self, u, logins):
+            counts.append((self.now, u, len(logins)))
+
+    ke = Test()
+    ke.reset()
+    ke.declare(User(name='a'))
+    for now in (0, 100, 200, 300):
+        ke.now = now
+        ke.declare(Login(user='a', at=now))
+        ke.declare(Login(user='b', at=now))
+        ke.run()
+
+    assert counts == [(0, 'a', 1), (100, 'a', 2), (200, 'a', 3),
+                      (300, 'a', 3)]
+
+    ke.now = 550
+    ke.run()
+    assert counts[-1] == (550, 'a', 1)
+
+    ke.now = 600
+    ke.run()
+    assert len(counts) == 5
+    assert not ke.agenda.activations
+
+
+def test_retematcher_beta_sharing_report():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a='a' << W()), Fact(b='a' << W()), Fact(c=1))
+        def rule1(self):
+            pass
+
+        @Rule(Fact(a='a' << W()), Fact(b='a' << W()), Fact(c=2))
+        def rule2(self):
+            pass
+
+    ke = Test()
+    ke.reset()
+    ke.declare(Fact(a=1), Fact(b=1), Fact(c=1))
+
+    report = ke.matcher.beta_sharing()
+
+    assert (report.joins, report.nodes) == (4, 3)
+    # The shared join stores Fact(a=1) and Fact(b=1), the others the
+    # joined token and Fact(c=1) (only for rule1).
+    assert report.tokens == 2 + 2 + 1
+    assert report.unshared_tokens == 2 * 2 + 2 + 1
+
+
+def test_retematcher_network_built_once_per_engine_class():
+    from pyknow import KnowledgeEngine, Rule, Fact, W, NOT
+    from pyknow.matchers.rete import ReteMatcher
+
+    class CountingMatcher(ReteMatcher):
+        builds = 0
+
+        def build_network(self):
+            CountingMatcher.builds += 1
+            super().build_network()
+
+    class Test(KnowledgeEngine):
+        __matcher__ = CountingMatcher
+
+        @Rule(Fact(a=W('x')), Fact(b=W('x')), NOT(Fact(c=W('x'))))
+        def rule1(self, x):
+            pass
+
+    ke1 = Test()
+    ke2 = Test()
+
+    assert CountingMatcher.builds == 1
+    assert ke1.matcher.root_node is not ke2.matcher.root_node
+
+    ke1.reset()
+    ke1.declare(Fact(a=1), Fact(b=1))
+    ke2.reset()
+    assert len(ke1.agenda.activations) == 1
+    assert len(ke2.agenda.activations) == 0
+
+    ke2.declare(Fact(a=1), Fact(b=1), Fact(a=2), Fact(b=2), Fact(c=2))
+    assert len(ke1.agenda.activations) == 1
+    assert len(ke2.agenda.activations) == 1
+
+
+def test_retematcher_instance_rules_are_not_shared():
+    from pyknow import KnowledgeEngine, Rule, Fact
+
+    class Test(KnowledgeEngine):
+        def __init__(self, extra=False):
+            if extra:
+                self.extra = Rule(Fact(b=1))(lambda self: None)
+            super().__init__()
+
+        @Rule(Fact(a=1))
+        def rule1(self):
+            pass
+
+    with_extra = Test(extra=True)
+    plain = Test()
+    for ke in (with_extra, plain):
+        ke.reset()
+        ke.declare(Fact(a=1), Fact(b=1))
+
+    assert len(with_extra.agenda.activations) == 2
+    assert len(plain.agenda.activations) == 1
+    assert plain.matcher.root_node is not with_extra.matcher.root_node
+
+
+def test_retematcher_network_copies_use_their_engine_clock():
+    from pyknow import KnowledgeEngine, Fact, Rule, W, WINDOW
+    from pyknow.matchers.rete.nodes import WindowNode
+
+    class Test(KnowledgeEngine):
+        now = 0
+
+        def clock(self):
+            return self.now
+
+        @Rule('logins' << WINDOW(Fact(user=W('u')), 300))
+        def count(self, logins):
+            pass
+
+    ke1 = Test()
+    ke2 = Test()
+    ke2.now = 1000
+
+    for ke in (ke1, ke2):
+        window, = ke.matcher._nodes(WindowNode)
+        assert window.clock() == ke.now
+
+
+def test_retematcher_copies_reuse_the_node_lookups():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+    from pyknow.matchers.rete import ReteMatcher
+    from pyknow.matchers.rete.nodes import ConflictSetNode
+
+    class CountingMatcher(ReteMatcher):
+        walks = 0
+
+        def _get_nodes(self, node_type):
+            CountingMatcher.walks += 1
+            return super()._get_nodes(node_type)
+
+    class Test(KnowledgeEngine):
+        __matcher__ = CountingMatcher
+
+        @Rule(Fact(a=W('x')), Fact(b=W('x')))
+        def rule1(self, x):
+            pass
+
+    ke1 = Test()
+    walks = CountingMatcher.walks
+    ke2 = Test()
+
+    for ke in (ke1, ke2, ke1, ke2):
+        ke.reset()
+        ke.declare(Fact(a=1), Fact(b=1))
+        ke.agenda.activations
+
+    assert CountingMatcher.walks == walks
+    csn1, = ke1.matcher._nodes(ConflictSetNode)
+    csn2, = ke2.matcher._nodes(ConflictSetNode)
+    assert csn1 is not csn2
+
+
+def test_retematcher_node_lookups_follow_root_changes():
+    from pyknow import KnowledgeEngine
+    from pyknow.matchers.rete import ReteMatcher
+    from pyknow.matchers.rete.nodes import ConflictSetNode
+    from pyknow.rule import Rule
+
+    matcher = ReteMatcher(KnowledgeEngine())
+    assert matcher._nodes(ConflictSetNode) == ()
+
+    csn = ConflictSetNode(Rule())
+    matcher.root_node.add_child(csn, csn.activate)
+    assert matcher._nodes(ConflictSetNode) == (csn, )
+
+
+def test_node_clone_copies_shared_nodes_once():
+    from pyknow.matchers.rete.nodes import BusNode, ConflictSetNode
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow.rule import Rule
+    from pyknow import Fact
+
+    root = BusNode()
+    tester = FeatureTesterNode(TypeCheck(Fact))
+    csn = ConflictSetNode(Rule())
+    root.add_child(tester, tester.activate)
+    tester.add_child(csn, csn.activate)
+    root.add_child(csn, csn.activate)
+    root.add(Fact())
+
+    memo = dict()
+    copy = root.clone(memo)
+
+    assert set(memo) == {root, tester, csn}
+    assert copy.by_type[Fact] == [memo[tester]]
+    assert copy.untyped[0].node is memo[csn]
+    assert copy.untyped[0].callback == memo[csn].activate
+    assert memo[csn].rule is csn.rule
+    assert len(csn.memory) == 1 and len(memo[csn].memory) == 0
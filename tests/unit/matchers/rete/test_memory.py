@@ -0,0 +1,91 @@
+import pytest
+
+
+def test_tokenmemory_behaves_like_a_list():
+    from pyknow.matchers.rete.memory import TokenMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow import Fact
+
+    memory = TokenMemory(['x'])
+    info1 = TokenInfo([Fact(1)], {'x': 1})
+    info2 = TokenInfo([Fact(2)], {'y': 2})
+
+    assert not memory
+    memory.append(info1)
+    memory.append(info2)
+    memory.append(info1)
+
+    assert len(memory) == 3
+    assert info1 in memory
+    assert sorted(memory, key=repr) == sorted([info1, info1, info2],
+                                              key=repr)
+
+    memory.remove(info1)
+    memory.remove(info1)
+    assert info1 not in memory
+    with pytest.raises(ValueError):
+        memory.remove(info1)
+
+    assert list(memory) == [info2]
+
+
+def test_tokenmemory_candidates_share_the_key_values():
+    from pyknow.matchers.rete.memory import TokenMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow import Fact
+
+    memory = TokenMemory(['x', 'y'])
+    a = TokenInfo([Fact(1)], {'x': 1, 'y': 1})
+    b = TokenInfo([Fact(2)], {'x': 1, 'y': 2})
+    c = TokenInfo([Fact(3)], {'x': 1})
+    for info in (a, b, c):
+        memory.append(info)
+
+    assert list(memory.candidates({'x': 1, 'y': 1})) == [a, c]
+    assert list(memory.candidates({'x': 2, 'y': 1})) == [c]
+    assert set(memory.candidates({'x': 1})) == {a, b, c}
+
+
+def test_tokenmemory_keyed_methods():
+    from pyknow.matchers.rete.memory import TokenMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow import Fact
+
+    memory = TokenMemory(['x'])
+    a = TokenInfo([Fact(1)], {'x': 1})
+    b = TokenInfo([Fact(2)], {'x': 2})
+    memory.append_keyed(a, (1, ))
+    memory.append(b)
+
+    assert a in memory
+    assert list(memory.candidates_keyed((1, ))) == [a]
+    assert list(memory.candidates_keyed((3, ))) == []
+
+    memory.remove_keyed(b, (2, ))
+    assert list(memory) == [a]
+    with pytest.raises(ValueError):
+        memory.remove_keyed(b, (2, ))
+
+
+def test_tokencounter_behaves_like_a_dict():
+    from pyknow.matchers.rete.memory import TokenCounter
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow import Fact
+
+    counter = TokenCounter(['x'])
+    a = TokenInfo([Fact(1)], {'x': 1})
+    b = TokenInfo([Fact(2)], {'x': 2})
+
+    counter[a] = 0
+    counter[b] = 3
+    counter[a] += 1
+
+    assert len(counter) == 2
+    assert counter[a] == 1
+    assert list(counter.candidates({'x': 2})) == [b]
+
+    assert counter.pop(b) == 3
+    assert b not in counter
+    assert list(counter.candidates({'x': 2})) == []
+    with pytest.raises(KeyError):
+        del counter[b]
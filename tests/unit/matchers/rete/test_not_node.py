@@ -202,3 +202,34 @@ def test_notnode_right_activate_valid_match_just_one(TestNode):
     assert Token.invalid(Fact(test='data')) in tn1.added
     assert Token.invalid(Fact(test='data')) in tn2.added
     assert nn.left_memory[token.to_info()] == 1
+
+
+def test_notnode_counts_only_matches_sharing_the_keys(TestNode):
+    from pyknow.matchers.rete.nodes import NotNode
+    from pyknow.matchers.rete.check import SameContextCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    nn = NotNode(SameContextCheck(), keys=['x'])
+    tn = TestNode()
+    nn.add_child(tn, tn.activate)
+
+    left = Token.valid(Fact(a=1), {'x': 1})
+    other = Token.valid(Fact(a=2), {'x': 2})
+    right = Token.valid(Fact(b=1), {'x': 1})
+
+    nn.activate_left(left)
+    nn.activate_left(other)
+    nn.activate_right(right)
+
+    assert nn.left_memory[left.to_info()] == 1
+    assert nn.left_memory[other.to_info()] == 0
+    assert tn.added == [left, other, left.to_info().to_invalid_token()]
+
+    nn.activate_right(Token.invalid(Fact(b=1), {'x': 1}))
+    assert nn.left_memory[left.to_info()] == 0
+    assert tn.added[-1] == left
+
+    nn.activate_left(Token.invalid(Fact(a=1), {'x': 1}))
+    assert left.to_info() not in nn.left_memory
+    assert tn.added[-1] == Token.invalid(Fact(a=1), {'x': 1})
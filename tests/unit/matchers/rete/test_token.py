@@ -77,12 +77,47 @@ def test_token_shortcut_invalid():
     assert Token.invalid([]) == Token(Token.TagType.INVALID, [])
 
 
-def test_token_copy_mutable():
+def test_token_is_immutable():
     from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    a = Token.valid([Fact()], {'a': 1})
+
+    assert a.copy() is a
+    assert isinstance(a.data, frozenset)
+    with pytest.raises(TypeError):
+        a.context['b'] = 2
+    with pytest.raises(TypeError):
+        a.context.update({'b': 2})
+
+
+def test_token_extend_creates_a_new_context():
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
 
-    a = Token.valid([])
-    b = a.copy()
+    a = Token.valid([Fact()], {'a': 1})
+    b = a.extend({'b': 2})
 
-    assert a == b and a is not b
-    assert a.data == b.data and a.data is not b.data
-    assert a.context == b.context and a.context is not b.context
+    assert a.context == {'a': 1}
+    assert b.context == {'a': 1, 'b': 2}
+    assert a.data is b.data and a.tag is b.tag
+
+
+def test_token_build_only_checks_in_debug_mode(monkeypatch):
+    from pyknow.matchers.rete.token import Token, Context
+    from pyknow.fact import Fact
+
+    data = frozenset([Fact()])
+    assert Token.build(Token.TagType.VALID, data, Context()) \
+        == Token.valid(data)
+
+    # Unchecked by default
+    Token.build(None, data, Context())
+
+    monkeypatch.setattr(Token, 'debug', True)
+    with pytest.raises(TypeError):
+        Token.build(None, data, Context())
+    with pytest.raises(TypeError):
+        Token.build(Token.TagType.VALID, [Fact()], Context())
+    with pytest.raises(TypeError):
+        Token.build(Token.TagType.VALID, data, {})
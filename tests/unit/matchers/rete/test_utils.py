@@ -55,3 +55,105 @@ def test_extract_facts():
     rule = Rule(OR(AND(Fact(1), NOT(Fact(2))), Fact(3)))
 
     assert utils.extract_facts(rule) == {Fact(1), Fact(2), Fact(3)}
+
+
+def test_bound_variables():
+    from pyknow.matchers.rete.utils import bound_variables
+    from pyknow import Fact, W, L, P, AND, NOT, WINDOW
+
+    pattern = 'f' << Fact(a='a' << W(),
+                          b=L(1) & ('b' << W()),
+                          c=~('c' << W()),
+                          d=P(lambda x: True))
+
+    assert bound_variables(pattern) == {'f', 'a', 'b'}
+    assert bound_variables(NOT(Fact(x='x' << W()))) == set()
+    assert bound_variables(
+        AND(Fact(x='x' << W()), 'w' << WINDOW(Fact(y='y' << W()), 10))
+    ) == {'x', 'y', 'w'}
+
+
+def test_wire_rule_indexes_joins_on_shared_variables():
+    from pyknow.matchers.rete import ReteMatcher
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a='a' << W(), b='b' << W()),
+              Fact(b='b' << W(), c='c' << W()),
+              Fact(c='c' << W(), a='a' << W()))
+        def rule1(self):
+            pass
+
+    matcher = Test().matcher
+    joins = matcher._get_nodes(OrdinaryMatchNode)
+
+    assert sorted(join.keys for join in joins) == [('a', 'c'), ('b', )]
+
+
+def test_wire_rule_indexes_not_nodes_on_shared_variables():
+    from pyknow.matchers.rete.nodes import NotNode
+    from pyknow import KnowledgeEngine, Rule, Fact, W, NOT
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a='a' << W(), b='b' << W()),
+              NOT(Fact(b='b' << W(), c='c' << W())))
+        def rule1(self):
+            pass
+
+    nots = Test().matcher._get_nodes(NotNode)
+
+    assert [node.keys for node in nots] == [('b', )]
+
+
+def test_wire_rule_shares_joins_with_the_same_inputs():
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode, NotNode
+    from pyknow import KnowledgeEngine, Rule, Fact, W, NOT
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a='a' << W()),
+              Fact(b='a' << W()),
+              NOT(Fact(c='a' << W())),
+              Fact(d=1))
+        def rule1(self):
+            pass
+
+        @Rule(Fact(a='a' << W()),
+              Fact(b='a' << W()),
+              NOT(Fact(c='a' << W())),
+              Fact(d=2))
+        def rule2(self):
+            pass
+
+        @Rule(Fact(a='a' << W()),
+              Fact(c='a' << W()))
+        def rule3(self):
+            pass
+
+    matcher = Test().matcher
+
+    assert len(matcher._get_nodes(OrdinaryMatchNode)) == 4
+    assert len(matcher._get_nodes(NotNode)) == 1
+
+
+def test_wire_rule_records_the_key_of_the_first_pattern():
+    from pyknow.matchers.rete.nodes import ConflictSetNode
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Test(KnowledgeEngine):
+        @Rule('f' << Fact(a=W('a')), Fact(b=W('a')))
+        def rule1(self):
+            pass
+
+        @Rule('f' << Fact(a=W('a')), Fact(c=W('a')))
+        def rule2(self):
+            pass
+
+    ke = Test()
+    ke.reset()
+    ke.declare(Fact(a=1), Fact(b=1), Fact(c=1))
+
+    csns = ke.matcher._get_nodes(ConflictSetNode)
+    assert len({csn.first_key for csn in csns}) == 1
+    for activation in ke.agenda.activations:
+        assert activation.first_fact()['a'] == 1
@@ -0,0 +1,126 @@
+def test_windownode_exists():
+    try:
+        from pyknow.matchers.rete.nodes import WindowNode
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_windownode_is_oneinputnode():
+    from pyknow.matchers.rete.nodes import WindowNode
+    from pyknow.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(WindowNode, OneInputNode)
+
+
+def test_windownode_groups_by_bound_variables(TestNode):
+    from pyknow.matchers.rete.nodes import WindowNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    wn = WindowNode(10, 'facts', clock=lambda: 0)
+    tn = TestNode()
+    wn.add_child(tn, tn.activate)
+
+    f1 = Fact(user='a', n=1)
+    f2 = Fact(user='b', n=2)
+    f3 = Fact(user='a', n=3)
+    for fact in (f1, f2, f3):
+        wn.activate(Token.valid(fact, {'user': fact['user'],
+                                       '__pattern__': fact}))
+
+    # Nothing is sent until flush
+    assert tn.added == []
+
+    wn.flush()
+
+    assert len(tn.added) == 2
+    tokens = {t.context['user']: t for t in tn.added}
+    assert tokens['a'].is_valid()
+    assert tokens['a'].data == {f1, f3}
+    assert tokens['a'].context == {'user': 'a', 'facts': (f1, f3)}
+    assert tokens['b'].context == {'user': 'b', 'facts': (f2, )}
+
+
+def test_windownode_invalid_token_updates_group(TestNode):
+    from pyknow.matchers.rete.nodes import WindowNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    wn = WindowNode(10, 'facts', clock=lambda: 0)
+    tn = TestNode()
+    wn.add_child(tn, tn.activate)
+
+    f1 = Fact(n=1)
+    f2 = Fact(n=2)
+    wn.activate(Token.valid(f1))
+    wn.activate(Token.valid(f2))
+    wn.flush()
+
+    wn.activate(Token.invalid(f1))
+    wn.flush()
+
+    assert [t.is_valid() for t in tn.added] == [True, False, True]
+    assert tn.added[1].context == {'facts': (f1, f2)}
+    assert tn.added[2].context == {'facts': (f2, )}
+
+    wn.activate(Token.invalid(f2))
+    wn.flush()
+
+    assert len(tn.added) == 4
+    assert not tn.added[3].is_valid()
+    assert wn.groups == {}
+
+
+def test_windownode_sliding_expiration(TestNode):
+    from pyknow.matchers.rete.nodes import WindowNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    now = 0
+    wn = WindowNode(10, 'facts', clock=lambda: now)
+    tn = TestNode()
+    wn.add_child(tn, tn.activate)
+
+    f1 = Fact(n=1)
+    f2 = Fact(n=2)
+    wn.activate(Token.valid(f1))
+    now = 5
+    wn.activate(Token.valid(f2))
+    wn.flush()
+    assert tn.added[-1].context == {'facts': (f1, f2)}
+
+    now = 10
+    wn.flush()
+    assert tn.added[-1].context == {'facts': (f2, )}
+
+    now = 15
+    wn.flush()
+    assert not tn.added[-1].is_valid()
+    assert not wn.arrivals
+
+
+def test_windownode_tumbling_expiration(TestNode):
+    from pyknow.matchers.rete.nodes import WindowNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    now = 2
+    wn = WindowNode(10, 'facts', tumbling=True, clock=lambda: now)
+    tn = TestNode()
+    wn.add_child(tn, tn.activate)
+
+    f1 = Fact(n=1)
+    f2 = Fact(n=2)
+    wn.activate(Token.valid(f1))
+    now = 9
+    wn.activate(Token.valid(f2))
+    wn.flush()
+    assert tn.added[-1].context == {'facts': (f1, f2)}
+
+    now = 10
+    f3 = Fact(n=3)
+    wn.activate(Token.valid(f3))
+    wn.flush()
+    assert tn.added[-2].context == {'facts': (f1, f2)}
+    assert not tn.added[-2].is_valid()
+    assert tn.added[-1].context == {'facts': (f3, )}
@@ -0,0 +1,215 @@
+def test_compiledmatcher_is_retematcher():
+    from pyknow.matchers import CompiledMatcher
+    from pyknow.matchers.rete import ReteMatcher
+
+    assert issubclass(CompiledMatcher, ReteMatcher)
+
+
+def test_compiledmatcher_keeps_source():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+    from pyknow.matchers import CompiledMatcher
+
+    class Test(KnowledgeEngine):
+        __matcher__ = CompiledMatcher
+
+        @Rule(Fact(a=1), Fact(b=W('x')), Fact(c=W('x')))
+        def rule1(self):
+            pass
+
+    ke = Test()
+
+    assert "def alpha(fact, tag):" in ke.matcher.source
+
+
+def test_compiledmatcher_merge():
+    from pyknow.matchers.compiled import merge
+
+    assert merge({'a': 1}, True) == {'a': 1}
+    assert merge({'a': 1}, {'b': 2}) == {'a': 1, 'b': 2}
+    assert merge({'a': 1}, {'a': 2}) is None
+    assert merge({'a': 1}, {(False, 'a'): 1}) is None
+    assert merge({(False, 'a'): 1}, {'a': 1}) is None
+    assert merge({(False, 'a'): 1}, {'a': 2}) == {(False, 'a'): 1,
+                                                  'a': 2}
+
+
+def _engines():
+    from pyknow import KnowledgeEngine, Rule, Fact, W, L, P, NOT, OR
+    from pyknow.matchers import CompiledMatcher
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    class Test(KnowledgeEngine):
+        @Rule(A(kind='x'))
+        def literal(self):
+            pass
+
+        @Rule(A(kind='y', value=P(lambda v: v > 1)))
+        def literal_and_predicate(self):
+            pass
+
+        @Rule(A(kind=L('x') | L('y'), value=W('v')))
+        def composed(self, v):
+            pass
+
+        @Rule(A(kind=~L('x'), value=W('v')))
+        def negated(self, v):
+            pass
+
+        @Rule(A(value=W('v'), other=W('v')))
+        def same_variable(self, v):
+            pass
+
+        @Rule('a' << A(value=W('v')), B(value=W('v')))
+        def join(self, a, v):
+            pass
+
+        @Rule(A(value=W('v'), kind=W('k')),
+              B(value=W('v'), kind=W('k')),
+              B(kind=W('k'), extra=W()))
+        def join_many(self, v, k):
+            pass
+
+        @Rule(A(value=W('v')), B(value=~W('v')))
+        def join_negated(self, v):
+            pass
+
+        @Rule(A(value=W('v')), NOT(B(value=W('v'))))
+        def negation(self, v):
+            pass
+
+        @Rule(OR(A(kind='x', value=W('v')), B(kind='x', value=W('v'))),
+              B(extra=W('v')))
+        def disjunction(self, v):
+            pass
+
+        @Rule(A(value=W('a')), B(value=W('b')), where=lambda a, b: a < b)
+        def where(self, a, b):
+            pass
+
+        @Rule(Fact(value=W('v')))
+        def untyped(self, v):
+            pass
+
+    class CompiledTest(Test):
+        __matcher__ = CompiledMatcher
+
+    return Test(), CompiledTest(), A, B
+
+
+def _activations(ke):
+    return sorted((a.rule.__name__,
+                   sorted(repr(f.as_key()) for f in a.facts))
+                  for a in ke.agenda.activations)
+
+
+def test_compiledmatcher_same_activations_as_retematcher():
+    interpreted, compiled, A, B = _engines()
+    facts = [A(kind='x', value=1),
+             A(kind='y', value=2, other=2),
+             A(kind='z', value=3, other=1),
+             A(kind=('x', ), value=1),
+             B(kind='x', value=1, extra=2),
+             B(kind='y', value=2, extra=1),
+             B(kind='z', value=4),
+             B(value=3, extra=3)]
+
+    for ke in (interpreted, compiled):
+        ke.reset()
+        ke.declare(*facts)
+    assert _activations(interpreted)
+    assert _activations(interpreted) == _activations(compiled)
+
+    for fact in facts[::3]:
+        for ke in (interpreted, compiled):
+            ke.retract(ke.facts.find(fact))
+        assert _activations(interpreted) == _activations(compiled)
+
+    for ke in (interpreted, compiled):
+        ke.modify(ke.facts.find(facts[1]), value=4)
+    assert _activations(interpreted) == _activations(compiled)
+
+
+def test_compiledmatcher_same_activations_on_random_changes():
+    import random
+
+    interpreted, compiled, A, B = _engines()
+    for ke in (interpreted, compiled):
+        ke.reset()
+
+    rng = random.Random(0)
+    declared = list()
+    for serial in range(60):
+        if declared and rng.random() < 0.3:
+            fact = declared.pop(rng.randrange(len(declared)))
+            for ke in (interpreted, compiled):
+                ke.retract(ke.facts.find(fact))
+        else:
+            fact = rng.choice([A, B])(kind=rng.choice('xyz'),
+                                      value=rng.randint(0, 3),
+                                      extra=rng.randint(0, 3),
+                                      serial=serial)
+            for ke in (interpreted, compiled):
+                ke.declare(fact.copy())
+            declared.append(fact)
+        assert _activations(interpreted) == _activations(compiled)
+
+
+def test_compiledmatcher_copies_reuse_the_generated_code():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+    from pyknow.matchers import CompiledMatcher
+
+    class Test(KnowledgeEngine):
+        __matcher__ = CompiledMatcher
+
+        @Rule(Fact(a=W('x')), Fact(b=W('x')))
+        def rule1(self, x):
+            pass
+
+    ke1 = Test()
+    ke2 = Test()
+
+    assert ke1.matcher._code is ke2.matcher._code
+    assert ke1.matcher._alpha is not ke2.matcher._alpha
+
+    for ke in (ke1, ke2):
+        ke.reset()
+    ke1.declare(Fact(a=1), Fact(b=1))
+    ke2.declare(Fact(a=1), Fact(b=2))
+
+    assert len(ke1.agenda.activations) == 1
+    assert len(ke2.agenda.activations) == 0
+
+
+def test_compiledmatcher_repeated_pattern():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+    from pyknow.matchers import CompiledMatcher
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    class Test(KnowledgeEngine):
+        @Rule(A(x=W('x')), B(x=W('x')), A(x=W('x')))
+        def repeated(self, x):
+            pass
+
+    class CompiledTest(Test):
+        __matcher__ = CompiledMatcher
+
+    interpreted, compiled = Test(), CompiledTest()
+    for ke in (interpreted, compiled):
+        ke.reset()
+        ke.declare(A(x=1), A(x=1, y=2), B(x=1), B(x=2))
+    assert _activations(interpreted)
+    assert _activations(interpreted) == _activations(compiled)
+
+    for ke in (interpreted, compiled):
+        ke.retract(ke.facts.find(A(x=1)))
+    assert _activations(interpreted) == _activations(compiled)
@@ -23,3 +23,53 @@ def test_activation_facts_only_iterable():
 
     with pytest.raises(TypeError):
         Activation(rule=Rule(), facts=None)
+
+
+def test_lazyactivation_equals_activation():
+    from pyknow.activation import Activation, LazyActivation
+    from pyknow import Rule, Fact
+
+    rule = Rule()
+    fact = Fact(a=1, __factid__=1)
+    lazy = LazyActivation(rule,
+                          frozenset([fact]),
+                          frozenset([('x', 1), ((False, 'y'), 2)]))
+
+    activation = Activation(rule, [fact], {'x': 1})
+
+    assert lazy == activation
+    assert activation == lazy
+    assert hash(lazy) == hash(activation)
+    assert lazy.context == {'x': 1}
+
+
+def test_lazyactivation_is_validated_on_materialize():
+    from pyknow.activation import Activation, LazyActivation
+    from pyknow import Rule, Fact
+    import pytest
+
+    rule = Rule()
+    lazy = LazyActivation(rule, frozenset([Fact(a=1)]), frozenset())
+
+    with pytest.raises(TypeError):
+        lazy.materialize()
+
+    fact = Fact(a=1, __factid__=1)
+    lazy = LazyActivation(rule, frozenset([fact]), frozenset([('x', 1)]))
+    activation = lazy.materialize()
+
+    assert type(activation) is Activation
+    assert activation == lazy
+    assert activation.materialize() is activation
+
+
+def test_activations_have_no_instance_dict():
+    from pyknow.activation import Activation, LazyActivation
+    from pyknow import Rule, Fact
+
+    fact = Fact(a=1, __factid__=1)
+    lazy = LazyActivation(Rule(), frozenset([fact]), frozenset([('x', 1)]))
+
+    for activation in (lazy, lazy.materialize()):
+        assert not hasattr(activation, '__dict__')
+        assert activation.context == {'x': 1}
@@ -24,3 +24,174 @@ def test_agenda_get_next():
     agenda.activations.append("Foo")
     assert agenda.get_next() == "Foo"
     assert "Foo" not in agenda.activations
+
+
+def test_agenda_get_next_follows_keys():
+    from pyknow.agenda import Agenda
+
+    agenda = Agenda()
+    agenda.add("B", 2)
+    agenda.add("A", 1)
+    agenda.add("C", 2)
+    agenda.add("D", 0)
+
+    assert list(agenda.activations) == ["D", "A", "B", "C"]
+    assert len(agenda) == 4
+    assert [agenda.get_next() for _ in range(5)] == ["D", "A", "B", "C",
+                                                     None]
+
+
+def test_agenda_remove_is_lazy():
+    from pyknow.agenda import Agenda
+
+    agenda = Agenda()
+    for key, act in enumerate("ABCDE"):
+        agenda.add(act, key)
+
+    assert agenda.remove("A")
+    assert agenda.remove("C")
+    assert not agenda.remove("C")
+    assert "A" not in agenda
+    assert len(agenda) == 3
+
+    assert agenda.get_next() == "B"
+    assert agenda.get_next() == "D"
+
+    # The heap is compacted when most of it are removed entries.
+    agenda.remove("E")
+    assert agenda._heaps['MAIN'] == []
+    assert agenda.get_next() is None
+
+
+def test_agenda_activations_assignment_keeps_order():
+    from pyknow.agenda import Agenda
+
+    agenda = Agenda()
+    agenda.add("A", 0)
+    agenda.activations = ["C", "B"]
+
+    assert list(agenda.activations) == ["C", "B"]
+    assert agenda.get_next() == "C"
+
+
+def test_agenda_remove_from_fact_removes_dependent_activations():
+    from pyknow.agenda import Agenda
+    from pyknow.activation import Activation
+    from pyknow.factlist import FactList
+    from pyknow import Rule, Fact
+
+    flist = FactList()
+    f1, f2, f3 = Fact(1), Fact(2), Fact(3)
+    for fact in (f1, f2, f3):
+        flist.declare(fact)
+
+    act1 = Activation(Rule(), (f1, ))
+    act2 = Activation(Rule(), (f1, f2))
+    act3 = Activation(Rule(), (f2, f3))
+
+    agenda = Agenda()
+    for key, act in enumerate([act1, act2, act3, act1]):
+        agenda.add(act, key)
+
+    assert agenda.remove_from_fact(f1['__factid__']) == 3
+    assert list(agenda.activations) == [act3]
+
+    assert agenda.remove_from_fact(f2) == 1
+    assert agenda.remove_from_fact(f3) == 0
+    assert not agenda
+    assert agenda._by_fact == {}
+
+
+def test_agenda_executes_only_focused_group():
+    from pyknow.agenda import Agenda
+    from pyknow.activation import Activation
+    from pyknow import Rule
+
+    main = Activation(Rule(), [])
+    enrich = Activation(Rule(agenda_group='enrich'), [])
+    score = Activation(Rule(agenda_group='score'), [])
+
+    agenda = Agenda()
+    for key, act in enumerate([score, enrich, main]):
+        agenda.add(act, key)
+
+    assert agenda.focus == 'MAIN'
+    assert list(agenda.activations) == [main, enrich, score]
+
+    agenda.set_focus('enrich', 'score')
+    assert agenda.focus_stack == ['MAIN', 'score', 'enrich']
+    assert list(agenda.activations) == [enrich, score, main]
+
+    assert agenda.get_next() == enrich
+    assert agenda.get_next() == score
+    assert agenda.get_next() == main
+    assert agenda.focus_stack == ['MAIN']
+    assert agenda.get_next() is None
+
+
+def test_agenda_get_next_ignores_unfocused_groups():
+    from pyknow.agenda import Agenda
+    from pyknow.activation import Activation
+    from pyknow import Rule
+
+    report = Activation(Rule(agenda_group='report'), [])
+
+    agenda = Agenda()
+    agenda.add(report, 0)
+
+    assert agenda.get_next() is None
+    assert len(agenda) == 1
+
+
+def test_agenda_executable_counts_focused_groups():
+    from pyknow.agenda import Agenda
+    from pyknow.activation import Activation
+    from pyknow import Rule
+
+    main = Activation(Rule(), [])
+    report = Activation(Rule(agenda_group='report'), [])
+
+    agenda = Agenda()
+    agenda.add(main, 0)
+    agenda.add(report, 0)
+    assert agenda.executable() == 1
+
+    agenda.set_focus('report')
+    assert agenda.executable() == 2
+
+    agenda.remove(report)
+    assert agenda.executable() == 1
+
+
+def test_agenda_activations_changes_are_written_back():
+    from pyknow.agenda import Agenda
+
+    agenda = Agenda()
+    for key, act in enumerate("ABC"):
+        agenda.add(act, key)
+
+    activations = agenda.activations
+    agenda.get_next()
+    activations.appendleft("D")
+    assert list(agenda) == ["D", "B", "C"]
+
+    del agenda.activations[1]
+    agenda.activations.rotate(1)
+    assert list(agenda.activations) == ["C", "D"]
+    assert len(agenda) == 2
+
+
+def test_agenda_activations_changes_run_before_strategy_keys():
+    from pyknow.agenda import Agenda
+    from pyknow.activation import Activation
+    from pyknow.strategies import DepthStrategy
+    from pyknow import Rule, Fact
+
+    old = Activation(Rule(), (Fact(__factid__=1), ))
+    new = Activation(Rule(salience=10), (Fact(__factid__=2), ))
+
+    agenda = Agenda()
+    agenda.activations.append(old)
+    DepthStrategy().update_agenda(agenda, [new], [])
+
+    assert list(agenda.activations) == [old, new]
@@ -790,3 +790,337 @@ def test_declare_raises_typeerror_if_conditionalelement_found():
 
     with pytest.raises(TypeError):
         ke.declare(Fact(L(1) & L(2)))
+
+
+def test_KnowledgeEngine_add_index_survives_reset():
+    from pyknow import KnowledgeEngine, Fact
+
+    ke = KnowledgeEngine()
+    ke.add_index(Fact, 'status')
+    assert ke.facts.indexes == [(Fact, 'status')]
+
+    ke.reset()
+    assert ke.facts.indexes == [(Fact, 'status')]
+
+
+def test_KnowledgeEngine_declare_many_updates_agenda_once():
+    from unittest.mock import patch
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            pass
+
+    ke = Test()
+    ke.reset()
+
+    with patch.object(ke.strategy, 'update_agenda',
+                      wraps=ke.strategy.update_agenda) as update_agenda:
+        ke.declare_many(Fact(value=i) for i in range(10))
+
+    assert update_agenda.call_count == 1
+    assert len(ke.facts.facts) == 11
+    assert len(ke.agenda.activations) == 10
+
+
+def test_KnowledgeEngine_retract_many_updates_agenda_once():
+    from unittest.mock import patch
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            pass
+
+    ke = Test()
+    ke.reset()
+    ke.declare_many(Fact(value=i) for i in range(10))
+
+    to_retract = (f for f in list(ke.facts.facts.values())
+                  if f.get('value', 0) % 2)
+
+    with patch.object(ke.strategy, 'update_agenda',
+                      wraps=ke.strategy.update_agenda) as update_agenda:
+        ke.retract_many(to_retract)
+
+    assert update_agenda.call_count == 1
+    assert len(ke.facts.facts) == 6
+    assert len(ke.agenda.activations) == 5
+
+
+def test_KnowledgeEngine_retract_many_unknown_fact_retracts_nothing():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+    import pytest
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            pass
+
+    ke = Test()
+    ke.reset()
+    ke.declare_many(Fact(value=i) for i in range(3))
+    facts = list(ke.facts.facts.values())
+    unknown = Fact(value=3, __factid__=100)
+
+    with pytest.raises(IndexError):
+        ke.retract_many(facts + [unknown])
+
+    assert list(ke.facts.facts.values()) == facts
+    assert len(ke.agenda.activations) == 3
+
+    ke.retract_many(facts[2:] + facts[2:])
+    assert list(ke.facts.facts.values()) == facts[:2]
+    assert len(ke.agenda.activations) == 1
+
+
+def test_KnowledgeEngine_feed_fires_all_rules():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    executions = []
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            executions.append(value)
+
+    ke = Test()
+    ke.reset()
+    ke.feed((Fact(value=i) for i in range(25)), chunk_size=10)
+
+    assert sorted(executions) == list(range(25))
+    assert not ke.agenda.activations
+    assert not ke.running
+
+
+def test_KnowledgeEngine_feed_pulls_lazily_with_backpressure():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    pulled = 0
+    backlog = []
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            backlog.append(len(self.agenda.activations))
+
+    def stream():
+        nonlocal pulled
+        for i in range(100):
+            pulled += 1
+            yield Fact(value=i)
+
+    ke = Test()
+    ke.reset()
+    ke.feed(stream(), chunk_size=5, max_pending=10)
+
+    assert pulled == 100
+    assert len(backlog) == 100
+    # Never more than a chunk plus the allowed pending activations.
+    assert max(backlog) < 5 + 10
+
+
+def test_KnowledgeEngine_feed_stops_on_halt():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    pulled = 0
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=3))
+        def rule1(self):
+            self.halt()
+
+    def stream():
+        nonlocal pulled
+        for i in range(100):
+            pulled += 1
+            yield Fact(value=i)
+
+    ke = Test()
+    ke.reset()
+    ke.feed(stream(), chunk_size=5)
+
+    assert pulled == 5
+
+
+def test_KnowledgeEngine_facts_expire_after_ttl():
+    from pyknow import KnowledgeEngine, Rule, Fact
+
+    class Reading(Fact):
+        pass
+
+    class Test(KnowledgeEngine):
+        now = 0
+
+        def clock(self):
+            return self.now
+
+        @Rule(Reading())
+        def rule1(self):
+            pass
+
+    ke = Test()
+    ke.set_ttl(Reading, 10)
+    ke.reset()
+    ke.declare(Reading(value=1))
+    ke.declare(Reading(value=2), ttl=20)
+    ke.declare(Fact(value=3))
+    assert len(ke.agenda.activations) == 2
+
+    ke.now = 10
+    ke.expire()
+    assert Reading(value=1) not in ke.facts
+    assert Reading(value=2) in ke.facts
+    assert Fact(value=3) in ke.facts
+    assert len(ke.agenda.activations) == 1
+
+    ke.now = 20
+    ke.run()
+    assert Reading(value=2) not in ke.facts
+    assert len(ke.facts.facts) == 2
+
+
+def test_KnowledgeEngine_run_expires_facts_before_firing():
+    from pyknow import KnowledgeEngine, Rule, Fact
+
+    fired = []
+
+    class Test(KnowledgeEngine):
+        now = 0
+
+        def clock(self):
+            return self.now
+
+        @Rule(Fact(value=1), salience=1)
+        def rule1(self):
+            fired.append(1)
+            self.now = 5
+
+        @Rule(Fact(value=2))
+        def rule2(self):
+            fired.append(2)
+
+    ke = Test()
+    ke.reset()
+    ke.declare(Fact(value=1))
+    ke.declare(Fact(value=2), ttl=5)
+    ke.run()
+
+    # The fact of rule2 expires while rule1 is being fired.
+    assert fired == [1]
+
+
+def test_KnowledgeEngine_agenda_groups_run_in_phases():
+    from pyknow import KnowledgeEngine, Rule, Fact
+
+    executed = []
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(phase='start'))
+        def start(self):
+            executed.append('start')
+            self.focus('ingest', 'score')
+
+        @Rule(Fact(value=1), agenda_group='score')
+        def score(self):
+            executed.append('score')
+
+        @Rule(Fact(value=1), agenda_group='ingest')
+        def ingest(self):
+            executed.append('ingest')
+
+        @Rule(Fact(value=1), agenda_group='report')
+        def report(self):
+            executed.append('report')
+
+    ke = Test()
+    ke.reset()
+    ke.declare(Fact(value=1))
+    ke.declare(Fact(phase='start'))
+    ke.run()
+
+    assert executed == ['start', 'ingest', 'score']
+    assert len(ke.agenda) == 1
+
+    ke.focus('report')
+    ke.run()
+    assert executed[-1] == 'report'
+    assert len(ke.agenda) == 0
+
+
+def test_KnowledgeEngine_feed_backpressure_ignores_unfocused_groups():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    pulled = 0
+    backlog = []
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            backlog.append(pulled)
+
+        @Rule(Fact(value=W('value')), agenda_group='report')
+        def report(self, value):
+            pass
+
+    def stream():
+        nonlocal pulled
+        for i in range(20):
+            pulled += 1
+            yield Fact(value=i)
+
+    ke = Test()
+    ke.reset()
+    ke.feed(stream(), chunk_size=1, max_pending=3)
+
+    # The activations of `report` can't run, so they don't count as
+    # pending and `rule1` keeps its backlog at `max_pending`.
+    assert backlog == list(range(4, 21)) + [20] * 3
+    assert len(ke.agenda) == 20
+
+    ke.focus('report')
+    ke.run()
+    assert not ke.agenda
+
+
+def test_KnowledgeEngine_run_only_matches_after_changes():
+    from unittest.mock import patch
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(value=W('value')))
+        def rule1(self, value):
+            if value == 0:
+                self.declare(Fact(value=10))
+
+    ke = Test()
+    ke.reset()
+    ke.declare_many(Fact(value=i) for i in range(5))
+
+    with patch.object(ke.matcher, 'changes',
+                      wraps=ke.matcher.changes) as changes:
+        ke.run()
+        # Only after the declaration inside rule1
+        assert changes.call_count == 1
+
+    assert len(ke.agenda) == 0
+    assert Fact(value=10) in ke.facts
+
+
+def test_KnowledgeEngine_rhs_receives_only_accepted_variables():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    received = []
+
+    class Test(KnowledgeEngine):
+        @Rule(Fact(a=W('a'), b=W('b'), c=W('c')))
+        def rule1(self, c, a):
+            received.append((a, c))
+
+    ke = Test()
+    ke.reset()
+    ke.declare(Fact(a=1, b=2, c=3))
+    ke.run()
+
+    assert received == [(1, 3)]
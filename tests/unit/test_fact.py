@@ -0,0 +1,239 @@
+"""
+Fact related tests
+"""
+import pytest
+
+
+def test_SchemaFact_stores_values_in_slots():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = Point(1, y=2)
+
+    assert not hasattr(p, '__dict__')
+    assert p['x'] == 1
+    assert p['y'] == 2
+    assert dict(p.items()) == {'x': 1, 'y': 2}
+    assert p == Point(x=1, y=2)
+    assert hash(p) == hash(Point(x=1, y=2))
+    assert p != Point(x=1, y=3)
+
+
+def test_SchemaFact_rejects_unknown_keys():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    with pytest.raises(KeyError):
+        Point(z=1)
+
+    with pytest.raises(KeyError):
+        Point(1, 2, 3)
+
+
+def test_SchemaFact_partial_facts():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = Point(y=2)
+
+    assert 'x' not in p
+    assert 'y' in p
+    assert p.get('x') is None
+    assert len(p) == 1
+    with pytest.raises(KeyError):
+        p['x']
+
+
+def test_SchemaFact_pop_uses_slots():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = Point(1)
+
+    assert p.pop('x') == 1
+    assert 'x' not in p
+    assert p.pop('x', None) is None
+    with pytest.raises(KeyError):
+        p.pop('x')
+
+
+def test_SchemaFact_popitem_uses_slots():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = Point(1, 2)
+
+    assert p.popitem() == ('y', 2)
+    assert p.items() == [('x', 1)]
+    assert p.popitem() == ('x', 1)
+    with pytest.raises(KeyError):
+        p.popitem()
+
+
+def test_SchemaFact_setdefault_uses_slots():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = Point(1)
+
+    assert p.setdefault('y', 2) == 2
+    assert p.get('y') == 2
+    assert p.setdefault('x', 3) == 1
+    assert dict.keys(p) == set()
+    with pytest.raises(KeyError):
+        p.setdefault('z', 3)
+
+
+def test_SchemaFact_clear_uses_slots():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = 'p' << Point(1, 2)
+    p.clear()
+
+    assert p.items() == []
+    assert p.__bind__ is None
+    assert p == Point()
+
+
+def test_SchemaFact_schema_is_inherited():
+    from pyknow import SchemaFact
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    class Point3D(Point):
+        __slots__ = ('z', )
+
+    assert Point3D.schema() == ('x', 'y', 'z')
+    assert Point3D(1, 2, 3)['z'] == 3
+
+
+def test_SchemaFact_special_keys():
+    from pyknow import SchemaFact
+    from pyknow.factlist import FactList
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = 'p' << Point(x=1)
+    assert p.__bind__ == 'p'
+    assert p['__bind__'] == 'p'
+
+    flist = FactList()
+    p = Point(x=1, y=2)
+    flist.declare(p)
+    assert p['__factid__'] == 0
+    assert '__factid__' in p
+    assert Point(x=1, y=2) in flist
+    assert p.copy().as_key() == p.as_key()
+
+
+def test_SchemaFact_in_engine():
+    from pyknow import SchemaFact, KnowledgeEngine, Rule, W
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    executions = []
+
+    class Test(KnowledgeEngine):
+        @Rule('p' << Point(x=W('x'), y=2))
+        def rule1(self, p, x):
+            executions.append((p, x))
+
+    ke = Test()
+    ke.reset()
+    ke.declare_many([Point(1, 2), Point(2, 3), Point(3, 2)])
+    ke.run()
+
+    assert sorted(x for _, x in executions) == [1, 3]
+    assert all(isinstance(p, Point) for p, _ in executions)
+
+
+def test_Fact_is_frozen_when_declared():
+    from pyknow import Fact
+    from pyknow.factlist import FactList
+
+    f = Fact(a=1)
+    f['b'] = 2
+    assert not f.frozen
+
+    FactList().declare(f)
+    assert f.frozen
+    assert f['__factid__'] == 0
+
+    with pytest.raises(TypeError):
+        f['a'] = 2
+    with pytest.raises(TypeError):
+        f.update({'c': 3})
+    with pytest.raises(TypeError):
+        del f['a']
+    with pytest.raises(TypeError):
+        f.pop('a')
+
+    assert f == Fact(a=1, b=2, __factid__=0)
+
+
+def test_Fact_hash_does_not_depend_on_special_keys():
+    from pyknow import Fact
+    from pyknow.factlist import FactList
+
+    f = Fact(a=1)
+    before = hash(f)
+    FactList().declare(f)
+
+    assert hash(f) == before
+    assert hash(f) == hash(Fact(a=1))
+
+
+def test_Fact_copy_of_frozen_fact_is_mutable():
+    from pyknow import Fact
+    from pyknow.factlist import FactList
+
+    f = Fact(a=1)
+    FactList().declare(f)
+
+    g = f.copy()
+    g['a'] = 2
+    assert not g.frozen
+    assert f['a'] == 1
+
+
+def test_SchemaFact_is_frozen_when_declared():
+    from pyknow import SchemaFact
+    from pyknow.factlist import FactList
+
+    class Point(SchemaFact):
+        __slots__ = ('x', 'y')
+
+    p = Point(1, 2)
+    FactList().declare(p)
+
+    with pytest.raises(TypeError):
+        p['x'] = 3
+    with pytest.raises(TypeError):
+        del p['x']
+    with pytest.raises(TypeError):
+        p.pop('x')
+    with pytest.raises(TypeError):
+        p.popitem()
+    with pytest.raises(TypeError):
+        p.setdefault('x', 3)
+    with pytest.raises(TypeError):
+        p.clear()
+    assert p.items() == [('x', 1), ('y', 2), ('__factid__', 0)]
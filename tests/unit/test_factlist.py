@@ -95,3 +95,173 @@ def test_factlist_changes():
 
     flist.retract_matching(Fact(b=1))
     assert flist.changes[1] == [f1]
+
+
+def test_factlist_declare_rejects_duplicated_content():
+    """ Facts with the same content are only declared once """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+    flist = FactList()
+
+    assert flist.declare(Fact(a=1)) == 0
+    assert flist.declare(Fact(a=1)) is None
+    assert flist.declare(Fact(a=2)) == 1
+    assert len(flist.facts) == 2
+
+
+def test_factlist_declare_duplicated_content_different_class():
+    """ Facts with the same content but different class are not equal """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    class Other(Fact):
+        pass
+
+    flist = FactList()
+
+    assert flist.declare(Fact(a=1)) == 0
+    assert flist.declare(Other(a=1)) == 1
+
+
+def test_factlist_index_and_contains():
+    """ Declared facts can be looked up by value """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+    import pytest
+
+    flist = FactList()
+    flist.declare(Fact(a=1))
+    flist.declare(Fact(a=2))
+
+    assert Fact(a=2) in flist
+    assert Fact(a=3) not in flist
+    assert flist.index(Fact(a=2)) == 1
+
+    with pytest.raises(ValueError):
+        flist.index(Fact(a=3))
+
+
+def test_factlist_retract_allows_redeclare():
+    """ A retracted fact content can be declared again """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+    import pytest
+
+    flist = FactList()
+    flist.declare(Fact(a=1))
+    flist.retract(0)
+
+    assert Fact(a=1) not in flist
+    assert flist.declare(Fact(a=1)) == 1
+
+    flist.retract_matching(Fact(a=1))
+    with pytest.raises(ValueError):
+        flist.retract_matching(Fact(a=1))
+
+
+def test_factlist_query_without_indexes():
+    """ Facts can be queried by type and slot values """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    class Order(Fact):
+        pass
+
+    flist = FactList()
+    flist.declare(Order(id=1, status='open'))
+    flist.declare(Order(id=2, status='closed'))
+    flist.declare(Order(id=3, status='open'))
+    flist.declare(Fact(id=4, status='open'))
+
+    assert [f['id'] for f in flist.find_all(Order(status='open'))] == [1, 3]
+    assert flist.find(Order(status='open'))['id'] == 1
+    assert flist.find(Order(status='unknown')) is None
+    assert flist.count(Order(status='open')) == 2
+    assert flist.count(Order()) == 3
+    assert flist.count(Order(id=3, status='open')) == 1
+
+
+def test_factlist_query_with_indexes():
+    """ Secondary indexes are maintained on declare and retract """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    class Order(Fact):
+        pass
+
+    flist = FactList()
+    flist.declare(Order(id=1, status='open'))
+    flist.add_index(Order, 'status')
+    flist.declare(Order(id=2, status='closed'))
+    flist.declare(Order(id=3, status='open'))
+    flist.declare(Order(id=4))
+
+    assert flist.indexes == [(Order, 'status')]
+    assert flist.count(Order(status='open')) == 2
+    assert flist.find(Order(id=2, status='closed'))['id'] == 2
+
+    assert flist.retract_all(Order(status='open')) == [0, 2]
+    assert flist.count(Order(status='open')) == 0
+    assert flist.count(Order()) == 2
+
+    flist.declare(Order(id=1, status='open'))
+    assert [f['id'] for f in flist.find_all(Order(status='open'))] == [1]
+
+
+
+def test_factlist_modify_records_modification():
+    """ modify retracts, declares and records the pair of facts """
+
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    flist = FactList()
+    old = Fact(a=1)
+    flist.declare(old)
+    flist.changes
+
+    new = Fact(a=2)
+    assert flist.modify(0, new) == 1
+
+    added, removed, modified = flist.changes
+    assert added == [new]
+    assert removed == [old]
+    assert modified == [(old, new)]
+
+
+def test_factlist_expired_returns_facts_past_deadline():
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    flist = FactList()
+    flist.declare(Fact(a=1), deadline=10)
+    flist.declare(Fact(a=2), deadline=5)
+    flist.declare(Fact(a=3))
+    flist.declare(Fact(a=4), deadline=20)
+
+    assert flist.next_deadline == 5
+    assert flist.expired(4) == []
+    assert flist.expired(10) == [1, 0]
+    assert flist.expired(10) == []
+
+    flist.retract(3)
+    assert flist.next_deadline is None
+    assert flist.expired(100) == []
+
+
+def test_factlist_modify_keeps_deadline():
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    flist = FactList()
+    flist.declare(Fact(a=1), deadline=10)
+    assert flist.modify(0, Fact(a=2)) == 1
+
+    assert flist.next_deadline == 10
+    assert flist.expired(10) == [1]
@@ -199,3 +199,46 @@ def test_Rule_can_decorate_method_with_mixed_args():
     obj.mymethod('x', 'y', a='a')
 
     assert called
+
+
+def test_WINDOW_is_bindable_and_compares_parameters():
+    from pyknow import WINDOW, Fact
+
+    window = 'x' << WINDOW(Fact(a=1), 10)
+
+    assert window.__bind__ == 'x'
+    assert window.pattern == Fact(a=1)
+    assert window == WINDOW(Fact(a=1), 10, __bind__='x')
+    assert window != WINDOW(Fact(a=1), 10, tumbling=True, __bind__='x')
+    assert window != WINDOW(Fact(a=1), 20, __bind__='x')
+    assert hash(window) == hash(WINDOW(Fact(a=1), 10, __bind__='x'))
+
+
+def test_Rule_get_arguments_uses_the_signature():
+    from pyknow import Rule
+
+    context = {'a': 1, 'b': 2, 'c': 3, '__pattern_0__': None}
+
+    @Rule()
+    def positional(self, b, a):
+        pass
+
+    @Rule()
+    def with_defaults(self, a, d=4):
+        pass
+
+    @Rule()
+    def any_keyword(self, a, **kwargs):
+        pass
+
+    @Rule()
+    def nothing(self):
+        pass
+
+    assert positional.get_arguments(context) == (2, 1)
+    assert with_defaults.get_arguments(context) == {'a': 1}
+    assert any_keyword.get_arguments(context) == {'a': 1, 'b': 2, 'c': 3}
+    assert nothing.get_arguments(context) == ()
+
+    # Missing variables are left to fail on the call
+    assert positional.get_arguments({'a': 1}) == {'a': 1}
@@ -210,3 +210,141 @@ def test_DepthStrategy_update_agenda_different_salience():
             < order.index(act3)
             < order.index(act2)
             < order.index(act1))
+
+
+def _declared_facts(n):
+    from pyknow import Fact
+    from pyknow.factlist import FactList
+
+    flist = FactList()
+    facts = [Fact(i) for i in range(n)]
+    for fact in facts:
+        flist.declare(fact)
+    return facts
+
+
+@pytest.mark.parametrize('name', ['BreadthStrategy', 'LEXStrategy',
+                                  'MEAStrategy', 'SimplicityStrategy',
+                                  'ComplexityStrategy', 'RandomStrategy'])
+def test_strategies_are_Strategy(name):
+    from pyknow import strategies
+    from pyknow.abstract import Strategy
+
+    assert issubclass(getattr(strategies, name), Strategy)
+
+
+def test_BreadthStrategy_executes_oldest_first():
+    from pyknow.strategies import BreadthStrategy
+    from pyknow.activation import Activation
+    from pyknow.agenda import Agenda
+    from pyknow import Rule
+
+    f1, f2, f3 = _declared_facts(3)
+    act1 = Activation(Rule(), (f1, ))
+    act2 = Activation(Rule(), (f2, ))
+    act3 = Activation(Rule(salience=1), (f3, ))
+
+    st = BreadthStrategy()
+    a = Agenda()
+    st.update_agenda(a, [act2], [])
+    st.update_agenda(a, [act1, act3], [])
+
+    assert list(a.activations) == [act3, act2, act1]
+
+
+def test_LEXStrategy_executes_most_recent_then_most_specific():
+    from pyknow.strategies import LEXStrategy
+    from pyknow.activation import Activation
+    from pyknow.agenda import Agenda
+    from pyknow import Rule, Fact
+
+    f1, f2, f3 = _declared_facts(3)
+    act1 = Activation(Rule(Fact(a=1)), (f1, f3))
+    act2 = Activation(Rule(Fact(a=1, b=2)), (f1, f3))
+    act3 = Activation(Rule(Fact(a=1)), (f2, ))
+    act4 = Activation(Rule(Fact(a=1)), (f3, ))
+
+    st = LEXStrategy()
+    a = Agenda()
+    st.update_agenda(a, [act3, act4, act1, act2], [])
+
+    assert list(a.activations) == [act2, act1, act4, act3]
+
+
+def test_MEAStrategy_executes_most_recent_first_pattern():
+    from pyknow.strategies import MEAStrategy
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    class C(Fact):
+        pass
+
+    class Test(KnowledgeEngine):
+        __strategy__ = MEAStrategy
+
+        # Both rules start with the same pattern, sharing its alpha
+        # branch.
+        @Rule(A(x=W('x')), B(x=W('x')))
+        def rule_b(self, x):
+            fired.append('b')
+
+        @Rule(A(x=W('x')), C(x=W('x')))
+        def rule_c(self, x):
+            fired.append('c')
+
+    # The rule whose first fact is the most recent fires first, even if
+    # the other one has the most recent fact overall.
+    for first, second, expected in [(B, C, ['b', 'c']),
+                                    (C, B, ['c', 'b'])]:
+        fired = []
+        ke = Test()
+        ke.reset()
+        ke.declare(A(x=1), A(x=2), first(x=2), second(x=1))
+        ke.run()
+        assert fired == expected
+
+
+def test_Simplicity_and_Complexity_strategies_order_by_specificity():
+    from pyknow.strategies import SimplicityStrategy, ComplexityStrategy
+    from pyknow.activation import Activation
+    from pyknow.agenda import Agenda
+    from pyknow import Rule, Fact
+
+    f1, f2, f3 = _declared_facts(3)
+    simple = Activation(Rule(Fact(a=1)), (f1, ))
+    complex_ = Activation(Rule(Fact(a=1, b=2), where=lambda: True), (f2, ))
+    newer = Activation(Rule(Fact(c=3)), (f3, ))
+
+    a = Agenda()
+    SimplicityStrategy().update_agenda(a, [simple, complex_, newer], [])
+    assert list(a.activations) == [newer, simple, complex_]
+
+    a = Agenda()
+    ComplexityStrategy().update_agenda(a, [simple, complex_, newer], [])
+    assert list(a.activations) == [complex_, newer, simple]
+
+
+def test_RandomStrategy_is_reproducible_with_seed():
+    from pyknow.strategies import RandomStrategy
+    from pyknow.activation import Activation
+    from pyknow.agenda import Agenda
+    from pyknow import Rule
+
+    facts = _declared_facts(20)
+    acts = [Activation(Rule(), (f, )) for f in facts]
+    important = Activation(Rule(salience=1), (facts[0], ))
+
+    orders = list()
+    for _ in range(2):
+        a = Agenda()
+        RandomStrategy(seed=42).update_agenda(a, acts + [important], [])
+        orders.append(list(a.activations))
+
+    assert orders[0] == orders[1]
+    assert orders[0][0] == important
+    assert orders[0][1:] != acts